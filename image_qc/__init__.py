@@ -1,9 +1,11 @@
-from .file_dialogs_tk import select_files
-from .data_editor_tk import DataEditorGUI
-
-__all__ = [
-    'select_files',
-    'DataEditorGUI',
-]
+from qc_common.lazy import lazy_exports
 
+# Resolved on first access (PEP 562) so that importing a submodule does not
+# load the editor and its pandas/PIL dependencies.
+_EXPORTS = {
+    'select_files': '.file_dialogs_tk',
+    'DataEditorGUI': '.data_editor_tk',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -1,8 +1,17 @@
 import os
 import pandas as pd
 import tkinter as tk
-from tkinter import ttk, simpledialog
-from PIL import Image, ImageTk
+from tkinter import ttk, simpledialog, messagebox
+from PIL import ImageTk
+
+from qc_common.journal import ChangeJournal, history_path_for, journal_path_for, recover
+
+from .image_cache import DISPLAY_SIZE, ImageCache, decode_region, source_size
+from .table_view import VirtualTable
+from .thumbnail_store import ThumbnailStore, thumbnail_folder_for
+
+# How often finished background decodes are turned into Tk images
+COLLECT_INTERVAL_MS = 50
 
 
 class DataEditorGUI:
@@ -11,17 +20,35 @@ class DataEditorGUI:
         self.csv_path = csv_path
         self.image_dir = image_dir
         self.mode = mode
+        self.edited_path = self.csv_path.replace('.csv', '_edited.csv')
+        self.journal = ChangeJournal(journal_path_for(self.edited_path),
+                                     history_path=history_path_for(self.edited_path))
         self.df = self.load_data()
         self.current_row = 0
+        # Rows either side of the current one whose images are decoded ahead
+        self.prefetch_rows = 3
+        self.images = ImageCache(store=ThumbnailStore(thumbnail_folder_for(self.image_dir)))
+        self._collect_job = None
+        self.zoomed = False
         self.editor_initials = self.get_editor_initials()
         self.init_ui()
 
     def load_data(self):
-        df = pd.read_csv(self.csv_path)
-        new_path = self.csv_path.replace('.csv', '_edited.csv')
-        df['edited'] = False
-        df['editor'] = ''
-        df.to_csv(new_path, index=False)
+        # Offer to continue from the edited CSV plus whatever a previous
+        # (possibly crashed) session left in its journal; otherwise start
+        # over from the source CSV, keeping the old edits in the history.
+        resumed = os.path.exists(self.edited_path) and messagebox.askyesno(
+            "Resume", f"Continue from the edits saved in {os.path.basename(self.edited_path)}?")
+        if resumed:
+            df = recover(self.edited_path)
+            print(f"Resumed from: {self.edited_path}")
+        else:
+            df = pd.read_csv(self.csv_path)
+            df['edited'] = False
+            df['editor'] = ''
+        self.journal.compact(df, self.edited_path)
+        if not resumed:
+            self.journal.start_session(self.csv_path)
         return df
 
     def get_editor_initials(self):
@@ -30,13 +57,15 @@ class DataEditorGUI:
     def init_ui(self):
         self.master.title('Data Editor')
         self.master.geometry('1200x800')
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
         main_frame = ttk.Frame(self.master)
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         left_frame = ttk.Frame(main_frame)
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.tree = ttk.Treeview(left_frame)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.table = VirtualTable(left_frame, self.df, on_select=self.select_row)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        self.tree = self.table.tree
 
         button_frame = ttk.Frame(left_frame)
         button_frame.pack(fill=tk.X)
@@ -47,37 +76,85 @@ class DataEditorGUI:
         self.next_button.pack(side=tk.LEFT)
         self.edit_button.pack(side=tk.LEFT)
 
-        right_frame = ttk.Frame(main_frame)
+        # The frame does not shrink-wrap the image, so the label's size (which
+        # images are scaled to fit) does not depend on the last image shown.
+        right_frame = ttk.Frame(main_frame, width=DISPLAY_SIZE[0], height=DISPLAY_SIZE[1])
+        right_frame.pack_propagate(False)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-        self.image_label = ttk.Label(right_frame)
+        self.image_label = ttk.Label(right_frame, anchor=tk.CENTER)
         self.image_label.pack(fill=tk.BOTH, expand=True)
+        # Click the image to see that part of it at full resolution
+        self.image_label.bind('<Button-1>', self.toggle_zoom)
 
-        self.update_table()
+        self.master.update_idletasks()
         self.load_current_row()
 
-    def update_table(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        columns = list(self.df.columns)
-        self.tree["columns"] = columns
-        self.tree["show"] = "headings"
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        self.tree.insert("", "end", values=list(self.df.iloc[self.current_row]))
+    def image_path(self, row):
+        return os.path.join(self.image_dir, self.df.loc[row, 'img_name'])
 
-    def load_current_row(self):
-        self.update_table()
-        basename = self.df.loc[self.current_row, 'img_name']
-        image_path = os.path.join(self.image_dir, basename)
-        if os.path.exists(image_path):
-            image = Image.open(image_path)
-            image = image.resize((400, 400))
-            photo = ImageTk.PhotoImage(image)
-            self.image_label.config(image=photo)
+    def display_size(self):
+        width, height = self.image_label.winfo_width(), self.image_label.winfo_height()
+        return (width, height) if width > 1 and height > 1 else DISPLAY_SIZE
+
+    def show_image(self, photo):
+        if photo is not None:
+            self.image_label.config(image=photo, text='')
             self.image_label.image = photo
         else:
-            self.image_label.config(text="Image not found")
+            self.image_label.config(image='', text="Image not found")
+            self.image_label.image = None
+
+    def load_current_row(self):
+        self.table.select(self.current_row)
+        self.zoomed = False
+        self.images.set_size(self.display_size())
+        self.show_image(self.images.photo(self.image_path(self.current_row)))
+        self.prefetch_images()
+
+    def toggle_zoom(self, event):
+        if self.zoomed:
+            self.zoomed = False
+            self.show_image(self.images.photo(self.image_path(self.current_row)))
+            return
+        shown = self.image_label.image
+        if shown is None:
+            return
+        path = self.image_path(self.current_row)
+        try:
+            full_width, full_height = source_size(path)
+        except OSError:
+            return
+        width, height = self.display_size()
+        # Where the click falls on the fitted image, as a fraction of it
+        fx = (event.x - (width - shown.width()) / 2) / shown.width()
+        fy = (event.y - (height - shown.height()) / 2) / shown.height()
+        fx, fy = min(max(fx, 0.0), 1.0), min(max(fy, 0.0), 1.0)
+        region_width, region_height = min(width, full_width), min(height, full_height)
+        left = min(max(int(fx * full_width - region_width / 2), 0), full_width - region_width)
+        top = min(max(int(fy * full_height - region_height / 2), 0), full_height - region_height)
+        region = decode_region(path, (left, top, left + region_width, top + region_height))
+        self.show_image(ImageTk.PhotoImage(region))
+        self.zoomed = True
+
+    def prefetch_images(self):
+        rows = []
+        for step in range(1, self.prefetch_rows + 1):
+            rows += [self.current_row + step, self.current_row - step]
+        rows = [row for row in rows if 0 <= row < len(self.df)]
+        self.images.schedule(self.image_path(row) for row in rows)
+        if self._collect_job is None and self.images.pending:
+            self._collect_job = self.master.after(COLLECT_INTERVAL_MS, self.collect_images)
+
+    def collect_images(self):
+        self.images.collect()
+        self._collect_job = None
+        if self.images.pending:
+            self._collect_job = self.master.after(COLLECT_INTERVAL_MS, self.collect_images)
+
+    def select_row(self, row):
+        if row != self.current_row:
+            self.current_row = row
+            self.load_current_row()
 
     def prev_row(self):
         if self.current_row > 0:
@@ -90,21 +167,30 @@ class DataEditorGUI:
             self.load_current_row()
 
     def edit_cell(self):
-        selected = self.tree.selection()[0]
         column = self.tree.identify_column(self.tree.winfo_pointerx() - self.tree.winfo_rootx())
         col_num = int(column.replace('#', '')) - 1
         col_name = self.df.columns[col_num]
         if col_name not in ['edited', 'editor']:
-            current_value = self.tree.item(selected)['values'][col_num]
+            current_value = self.df.at[self.current_row, col_name]
             new_value = simpledialog.askstring("Edit Value", f"Edit {col_name}:", initialvalue=current_value)
             if new_value is not None:
                 self.df.at[self.current_row, col_name] = new_value
                 self.df.at[self.current_row, 'edited'] = True
                 self.df.at[self.current_row, 'editor'] = self.editor_initials
-                self.save_edits()
-                self.update_table()
+                self.journal.append('set', self.current_row,
+                                    {col_name: new_value, 'edited': True, 'editor': self.editor_initials},
+                                    editor=self.editor_initials)
+                self.table.refresh_row(self.current_row)
 
     def save_edits(self):
-        self.df.to_csv(self.csv_path.replace('.csv', '_edited.csv'), index=False)
+        self.journal.compact(self.df, self.edited_path)
+
+    def on_close(self):
+        if self._collect_job is not None:
+            self.master.after_cancel(self._collect_job)
+        self.images.shutdown()
+        self.save_edits()
+        self.journal.close()
+        self.master.destroy()
 
 
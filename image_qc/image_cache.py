@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+from PIL import Image, ImageTk
+
+DISPLAY_SIZE = (400, 400)
+
+
+def fit_size(source: Tuple[int, int], size: Tuple[int, int]) -> Tuple[int, int]:
+    """The largest size with the aspect ratio of `source` that fits in `size`."""
+    scale = min(size[0] / source[0], size[1] / source[1])
+    return max(1, round(source[0] * scale)), max(1, round(source[1] * scale))
+
+
+def _select_pyramid_level(image, size):
+    # Pyramidal TIFFs store successively halved copies of the page as
+    # further pages; use the smallest one that still covers `size`. Pages
+    # that are not reduced copies of the first (a multi-page document)
+    # end the search.
+    if image.format != 'TIFF' or getattr(image, 'n_frames', 1) < 2:
+        return
+    width, height = image.size
+    aspect = width / height
+    best = 0
+    for page in range(1, image.n_frames):
+        image.seek(page)
+        w, h = image.size
+        if w >= width or h >= height or abs(w / h - aspect) > 0.02 * aspect:
+            break
+        if w < size[0] or h < size[1]:
+            break
+        best, width, height = page, w, h
+    image.seek(best)
+
+
+def decode_image(path: str, size: Tuple[int, int] = DISPLAY_SIZE) -> Image.Image:
+    """
+    Open an image scaled to fit `size`, keeping its aspect ratio, while
+    decoding as few pixels as the format allows: JPEGs are decoded at a
+    reduced scale with `draft`, and pyramidal TIFFs are read from their
+    smallest sufficient level. Touches no Tk state.
+    """
+    with Image.open(path) as image:
+        target = fit_size(image.size, size)
+        _select_pyramid_level(image, target)
+        image.draft(None, target)
+        return image.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+def source_size(path: str) -> Tuple[int, int]:
+    """Full-resolution size, read from the header only."""
+    with Image.open(path) as image:
+        return image.size
+
+
+def decode_region(path: str, box: Tuple[int, int, int, int]) -> Image.Image:
+    """
+    The `box` (left, upper, right, lower) of `path` at full resolution.
+
+    Pillow has no partial decode for JPEG or compressed TIFF, so the page
+    is decoded once and cropped; only the crop is kept.
+    """
+    with Image.open(path) as image:
+        return image.crop(box)
+
+
+class ImageCache:
+    """
+    Display-ready images for the rows around the one under review.
+
+    `schedule` hands image paths to a thread pool that decodes and scales
+    them off the Tk thread. Tk images may only be created on the Tk thread,
+    so `collect`, polled from the event loop, turns finished decodes into
+    `PhotoImage`s and keeps the most recent `capacity` of them. Moving to a
+    prefetched row then only swaps a ready `PhotoImage` into the label.
+
+    Images are decoded at `size` (see `decode_image`); `set_size` follows
+    the label when the window is resized. With a `ThumbnailStore`, images
+    are scaled down from its stored thumbnails whenever those are large
+    enough, so the full scans are only decoded once per store.
+    """
+
+    def __init__(self, size: Tuple[int, int] = DISPLAY_SIZE, capacity: int = 32, workers: int = 2,
+                 store=None):
+        self.size = size
+        self.capacity = capacity
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='images')
+        self._futures = OrderedDict()
+        self._photos = OrderedDict()
+
+    def set_size(self, size: Tuple[int, int]):
+        """Change the display size, dropping images decoded for the old one."""
+        if tuple(size) == tuple(self.size):
+            return
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._photos.clear()
+        self.size = tuple(size)
+
+    def _decode(self, path):
+        store = self.store
+        if store is not None and self.size[0] <= store.size[0] and self.size[1] <= store.size[1]:
+            image = store.load(path)
+            return image.resize(fit_size(image.size, self.size), Image.Resampling.LANCZOS)
+        return decode_image(path, self.size)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._futures)
+
+    def schedule(self, paths: Iterable[str]):
+        wanted = list(OrderedDict.fromkeys(paths))
+        for path in list(self._futures):
+            if path not in wanted:
+                self._futures.pop(path).cancel()
+        for path in wanted:
+            if path not in self._photos and path not in self._futures:
+                self._futures[path] = self._executor.submit(self._decode, path)
+
+    def _store(self, path, image):
+        photo = ImageTk.PhotoImage(image)
+        self._photos[path] = photo
+        while len(self._photos) > self.capacity:
+            self._photos.popitem(last=False)
+        return photo
+
+    def collect(self):
+        """Wrap finished decodes in PhotoImages. Call from the Tk thread."""
+        for path, future in list(self._futures.items()):
+            if not future.done():
+                continue
+            del self._futures[path]
+            if not future.cancelled() and future.exception() is None:
+                self._store(path, future.result())
+
+    def photo(self, path: str) -> Optional[ImageTk.PhotoImage]:
+        """
+        The display image for `path`, decoding it now if it was not
+        prefetched, or None if it cannot be read. Call from the Tk thread.
+        """
+        photo = self._photos.get(path)
+        if photo is not None:
+            self._photos.move_to_end(path)
+            self.hits += 1
+            return photo
+        self.misses += 1
+        future = self._futures.pop(path, None)
+        try:
+            image = future.result() if future is not None else self._decode(path)
+        except Exception:
+            return None
+        return self._store(path, image)
+
+    def shutdown(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._photos.clear()
+        self._executor.shutdown(wait=False)
@@ -1,16 +1,26 @@
+import importlib
 import tkinter as tk
 try:
     from .file_dialogs_tk import select_files
-    from .data_editor_tk import DataEditorGUI
 except ImportError:
     import os, sys
-    sys.path.append(os.path.dirname(__file__))
-    from file_dialogs_tk import select_files
-    from data_editor_tk import DataEditorGUI
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from image_qc.file_dialogs_tk import select_files
+from qc_common.lazy import preload
 
+EDITOR_MODULE = 'image_qc.data_editor_tk'
 
-if __name__ == '__main__':
+
+def main():
+    # Import the editor (pandas, PIL) while the file dialogs are open.
+    loader = preload(EDITOR_MODULE)
     test_fpath, image_dirs = select_files()
+    loader.join()
+    DataEditorGUI = importlib.import_module(EDITOR_MODULE).DataEditorGUI
     root = tk.Tk()
     editor = DataEditorGUI(root, test_fpath, image_dirs)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional
+
+import pandas as pd
+
+DEFAULT_ROW_HEIGHT = 20
+WHEEL_ROWS = 3
+
+
+class VirtualTable(ttk.Frame):
+    """
+    A Treeview over a whole DataFrame that only holds the rows in view.
+
+    The tree keeps one item per visible line; scrolling rewrites their
+    values in place for the new window of rows instead of inserting an
+    item per DataFrame row, so a 100k-row CSV costs no more to show or
+    scroll than a page of it. The vertical scrollbar is driven by the
+    DataFrame's length rather than by the tree.
+
+    Selecting a line calls `on_select(row)` with its DataFrame row.
+    """
+
+    def __init__(self, master, df: pd.DataFrame, on_select: Optional[Callable[[int], None]] = None,
+                 column_width: int = 100):
+        super().__init__(master)
+        self.df = df
+        self.on_select = on_select
+        self.top = 0
+        self.selected = None
+        self._items = []
+        self._lines = 1
+
+        columns = [str(col) for col in df.columns]
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', selectmode='browse')
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width, stretch=False)
+        self.vbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.hbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.hbar.set)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vbar.grid(row=0, column=1, sticky='ns')
+        self.hbar.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(WHEEL_ROWS))
+        for key, step in (('<Up>', -1), ('<Down>', 1)):
+            self.tree.bind(key, lambda e, step=step: self._step(step))
+        for key, sign in (('<Prior>', -1), ('<Next>', 1)):
+            self.tree.bind(key, lambda e, sign=sign: self._step(sign * self._lines))
+
+    def _row_height(self):
+        try:
+            return int(ttk.Style(self).lookup('Treeview', 'rowheight')) or DEFAULT_ROW_HEIGHT
+        except (tk.TclError, ValueError):
+            return DEFAULT_ROW_HEIGHT
+
+    def _on_configure(self, event):
+        row_height = self._row_height()
+        # One line of the height goes to the headings
+        lines = max(1, event.height // row_height - 1)
+        if lines != self._lines:
+            self._lines = lines
+            self.refresh()
+
+    def _clamp_top(self, top):
+        return min(max(top, 0), max(len(self.df) - self._lines, 0))
+
+    def refresh(self):
+        """Rewrite the visible lines from the DataFrame."""
+        self.top = self._clamp_top(self.top)
+        count = min(self._lines, len(self.df) - self.top)
+        while len(self._items) < count:
+            self._items.append(self.tree.insert('', 'end'))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
+        window = self.df.iloc[self.top:self.top + count]
+        for item, values in zip(self._items, window.itertuples(index=False, name=None)):
+            self.tree.item(item, values=list(values))
+        self._show_selection()
+        if len(self.df):
+            self.vbar.set(self.top / len(self.df), (self.top + count) / len(self.df))
+        else:
+            self.vbar.set(0, 1)
+
+    def refresh_row(self, row: int):
+        if self.top <= row < self.top + len(self._items):
+            self.tree.item(self._items[row - self.top], values=list(self.df.iloc[row]))
+
+    def _show_selection(self):
+        row = self.selected
+        if row is not None and self.top <= row < self.top + len(self._items):
+            item = self._items[row - self.top]
+            if self.tree.selection() != (item,):
+                self.tree.selection_set(item)
+            self.tree.focus(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+    def see(self, row: int):
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + self._lines:
+            self.top = row - self._lines + 1
+        self.refresh()
+
+    def select(self, row: int):
+        """Select `row` and scroll it into view, without calling `on_select`."""
+        self.selected = row
+        self.see(row)
+
+    def scroll(self, lines: int):
+        top = self._clamp_top(self.top + lines)
+        if top != self.top:
+            self.top = top
+            self.refresh()
+        return 'break'
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self.top = self._clamp_top(int(float(args[1]) * len(self.df)))
+            self.refresh()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            self.scroll(amount * self._lines if args[2] == 'pages' else amount)
+
+    def _step(self, step):
+        if len(self.df):
+            current = self.top if self.selected is None else self.selected
+            self._select_row(min(max(current + step, 0), len(self.df) - 1))
+        return 'break'
+
+    def _select_row(self, row):
+        self.select(row)
+        if self.on_select is not None:
+            self.on_select(row)
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._items:
+            return
+        row = self.top + self._items.index(selection[0])
+        if row != self.selected:
+            self._select_row(row)
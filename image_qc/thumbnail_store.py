@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import pandas as pd
+from PIL import Image
+
+from .image_cache import decode_image
+
+THUMBNAIL_FOLDER = '.qc_thumbnails'
+THUMBNAIL_SIZE = (1024, 1024)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def thumbnail_folder_for(image_dir: str) -> str:
+    # Kept with the images so every reviewer on the share uses the same store.
+    return os.path.join(image_dir, THUMBNAIL_FOLDER)
+
+
+class ThumbnailStore:
+    """
+    Pre-scaled copies of source images, saved as JPEGs under `folder`.
+
+    A thumbnail's file name is a hash of the source path (relative to the
+    store's parent folder, so it is shared by reviewers whatever the share
+    is mounted as), the source's byte size and mtime, and the thumbnail
+    size. Editing or replacing a source therefore gives it a new entry, and
+    stale entries are simply never read again. `prune` deletes the least
+    recently used thumbnails once the store is over `max_bytes`; `put`
+    calls it itself, having sized the store on its first write.
+    """
+
+    def __init__(self, folder: str, size: Tuple[int, int] = THUMBNAIL_SIZE,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.folder = folder
+        self.size = tuple(size)
+        self.max_bytes = max_bytes
+        self._base = os.path.dirname(os.path.abspath(folder))
+        self._lock = threading.Lock()
+        self._nbytes = None
+
+    def key(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        rel = os.path.relpath(os.path.abspath(path), self._base).replace(os.sep, '/')
+        ident = f"{rel}|{stat.st_size}|{stat.st_mtime_ns}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.folder, key[:2], key + '.jpg')
+
+    def get(self, path: str) -> Optional[Image.Image]:
+        key = self.key(path)
+        if key is None:
+            return None
+        thumb_path = self.path_for(key)
+        try:
+            with Image.open(thumb_path) as image:
+                image.load()
+            # The mtime doubles as the last-used time for pruning
+            os.utime(thumb_path)
+        except OSError:
+            return None
+        return image
+
+    def put(self, path: str, image: Image.Image) -> int:
+        """Save `image` as the thumbnail of `path`; returns the bytes written."""
+        key = self.key(path)
+        if key is None:
+            return 0
+        thumb_path = self.path_for(key)
+        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+        tmp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        image.save(tmp_path, 'JPEG', quality=90)
+        os.replace(tmp_path, thumb_path)
+        nbytes = os.path.getsize(thumb_path)
+        with self._lock:
+            known = self._nbytes is not None
+            if known:
+                self._nbytes += nbytes
+        if not known:
+            # Walk the store once, on the first write; the walk already
+            # counts the thumbnail just saved.
+            total = sum(size for _, size, _ in self._entries())
+            with self._lock:
+                if self._nbytes is None:
+                    self._nbytes = total
+                else:
+                    self._nbytes += nbytes
+        with self._lock:
+            over = self._nbytes > self.max_bytes
+        if over:
+            self.prune()
+        return nbytes
+
+    def load(self, path: str) -> Image.Image:
+        """The thumbnail of `path`, decoding and storing it on a miss."""
+        image = self.get(path)
+        if image is None:
+            image = decode_image(path, self.size)
+            try:
+                self.put(path, image)
+            except OSError as e:
+                print(f"Could not store thumbnail of {path}: {e}")
+        return image
+
+    def _entries(self):
+        entries = []
+        for root, dirs, files in os.walk(self.folder):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+        return entries
+
+    def prune(self) -> int:
+        """Delete the least recently used thumbnails until under `max_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._nbytes = total
+        return removed
+
+
+def _warm_one(folder, size, max_bytes, path):
+    store = ThumbnailStore(folder, size, max_bytes)
+    if store.get(path) is not None:
+        return 0
+    return store.put(path, decode_image(path, size))
+
+
+def warm_thumbnails(csv_path: str, image_dir: str, workers: Optional[int] = None,
+                    size: Tuple[int, int] = THUMBNAIL_SIZE, max_bytes: int = DEFAULT_MAX_BYTES) -> List[str]:
+    """
+    Build the thumbnails for every `img_name` in `csv_path` in a process
+    pool, then prune the store. Returns the images that could not be read.
+    """
+    folder = thumbnail_folder_for(image_dir)
+    names = pd.read_csv(csv_path, usecols=['img_name'])['img_name'].dropna().astype(str).unique()
+    paths = [os.path.join(image_dir, name) for name in names]
+    failed, written = [], 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_warm_one, folder, size, max_bytes, path): path for path in paths}
+        for future, path in futures.items():
+            try:
+                written += future.result()
+            except Exception as e:
+                print(f"Thumbnail of {path} failed: {e}")
+                failed.append(path)
+    removed = ThumbnailStore(folder, size, max_bytes).prune()
+    print(f"{len(paths) - len(failed)} thumbnails ready in {folder} "
+          f"({written / 1e6:.1f} MB written, {removed} evicted)")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-build image QC thumbnails for a CSV')
+    parser.add_argument('csv_path', help='CSV with an img_name column')
+    parser.add_argument('image_dir', help='Folder the img_name paths are relative to')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--size', type=int, default=THUMBNAIL_SIZE[0],
+                        help='Longest side of a thumbnail, in pixels')
+    parser.add_argument('--max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Size the store is pruned to')
+    args = parser.parse_args(argv)
+    warm_thumbnails(os.path.abspath(args.csv_path), os.path.abspath(args.image_dir), args.workers,
+                    (args.size, args.size), args.max_mb * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    main()
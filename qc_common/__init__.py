@@ -0,0 +1,15 @@
+from .lazy import lazy_exports
+
+# Names are resolved on first access (PEP 562), so importing a light
+# submodule such as qc_common.scan does not pull pandas in through journal.
+_EXPORTS = {
+    'ChangeJournal': '.journal',
+    'history_path_for': '.journal',
+    'journal_path_for': '.journal',
+    'recover': '.journal',
+    'restore_version': '.journal',
+    'write_csv_atomic': '.journal',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(__name__, _EXPORTS)
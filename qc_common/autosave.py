@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Callable, Optional
+
+import pandas as pd
+
+from .journal import write_csv_atomic
+
+
+class AutosaveWriter:
+    """
+    Write DataFrame snapshots to disk on a background thread.
+
+    `submit` copies the frame on the caller's thread (a memory copy, no
+    formatting) and returns immediately. Snapshots for the same path are
+    coalesced so only the latest one is written, at most `delay` seconds
+    after the first unsaved submission. `write(df, path)` defaults to an
+    atomic temp-file-and-rename CSV write; `then()` runs on the writer
+    thread after a successful write.
+    """
+
+    def __init__(self, delay: float = 1.0):
+        self.delay = delay
+        self.last_error = None
+        self._pending = {}
+        self._writing = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, df: pd.DataFrame, write: Optional[Callable] = None,
+               then: Optional[Callable] = None):
+        snapshot = df.copy()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AutosaveWriter is closed")
+            due = self._pending[path][0] if path in self._pending else time.monotonic() + self.delay
+            self._pending[path] = (due, snapshot, write or write_csv_atomic, then)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything pending now and wait until it is on disk."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            for path, (_, snapshot, write, then) in list(self._pending.items()):
+                self._pending[path] = (0.0, snapshot, write, then)
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                if self._pending:
+                    path = min(self._pending, key=lambda p: self._pending[p][0])
+                    wait = self._pending[path][0] - time.monotonic()
+                    if wait <= 0:
+                        self._writing += 1
+                        return (path,) + self._pending.pop(path)[1:]
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            path, snapshot, write, then = job
+            try:
+                write(snapshot, path)
+                if then is not None:
+                    then()
+            except Exception as e:
+                self.last_error = e
+                print(f"Autosave of {path} failed: {e}")
+            finally:
+                with self._cond:
+                    self._writing -= 1
+                    self._cond.notify_all()
@@ -0,0 +1,344 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def journal_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + '_journal.jsonl'
+
+
+def history_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + '_history.jsonl'
+
+
+def _fsync_replace(tmp_path, path):
+    os.replace(tmp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_tmp_csv(df, path):
+    data = df.to_csv(index=False).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path, hashlib.sha1(data).hexdigest()
+
+
+def write_csv_atomic(df: pd.DataFrame, path: str) -> str:
+    """
+    Write `df` to `path` through a temporary file and rename, so readers
+    and crashes never see a half-written CSV. Returns the SHA-1 of the
+    written bytes.
+    """
+    tmp_path, digest = _write_tmp_csv(df, path)
+    _fsync_replace(tmp_path, path)
+    return digest
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    raise TypeError(f"Cannot journal value of type {type(value).__name__}")
+
+
+def _set_cell(df, row, column, value):
+    # A label column read back from CSV is all-NaN float64; widen it to
+    # object before storing text so newer pandas does not refuse the upcast.
+    if column in df.columns and isinstance(value, str) and df[column].dtype != object:
+        df[column] = df[column].astype(object)
+    df.at[row, column] = value
+
+
+def apply_change(df: pd.DataFrame, record: dict) -> pd.DataFrame:
+    """
+    Apply one journal record to `df` and return the resulting frame.
+    """
+    op, row, values = record['op'], record.get('row'), record.get('values')
+    if op == 'set':
+        for column, value in values.items():
+            _set_cell(df, row, column, value)
+    elif op == 'row':
+        for column, value in zip(df.columns, values):
+            _set_cell(df, row, column, value)
+    elif op == 'insert':
+        new_df = pd.DataFrame([values], columns=df.columns)
+        df = pd.concat([df.iloc[:row], new_df, df.iloc[row:]], ignore_index=True)
+    elif op == 'drop':
+        df = df.drop(row).reset_index(drop=True)
+    elif op == 'sort':
+        df = df.sort_values('onset').reset_index(drop=True)
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+    return df
+
+
+def read_records(path: str) -> List[dict]:
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash mid-append leaves at most one partial last line
+                break
+    return records
+
+
+def pending_changes(csv_path: str, records: List[dict]) -> List[dict]:
+    """
+    Return the journal records that are not yet part of the CSV at
+    `csv_path`.
+
+    The journal starts with a `base` record holding the digest of the CSV
+    it applies to. A compaction writes a `checkpoint` record with the new
+    CSV's digest and the last sequence number it contains before replacing
+    the CSV, so if the process dies between replacing the CSV and starting
+    a new journal, only the changes made after that snapshot are replayed.
+    """
+    if not records or records[0].get('op') != 'base':
+        return []
+    digest = file_digest(csv_path)
+    changes = [r for r in records[1:] if r.get('op') != 'checkpoint']
+    if records[0].get('digest') == digest:
+        return changes
+    for record in reversed(records):
+        if record.get('op') == 'checkpoint' and record.get('digest') == digest:
+            return [r for r in changes if r.get('seq', 0) > record['seq']]
+    return []
+
+
+def recover(csv_path: str, journal_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Rebuild the latest state of an edited CSV by replaying its journal.
+    """
+    journal_path = journal_path or journal_path_for(csv_path)
+    df = pd.read_csv(csv_path)
+    for record in pending_changes(csv_path, read_records(journal_path)):
+        df = apply_change(df, record)
+    return df
+
+
+def read_history(history_path: str) -> List[dict]:
+    """
+    Split a history file into sessions: one dict per `session` record with
+    its `source` CSV (or the `snapshot` text of a CSV that predates the
+    history) and the change `records` made on top of it.
+    """
+    sessions = []
+    last_seq = None
+    for record in read_records(history_path):
+        if record.get('op') == 'session':
+            sessions.append({'source': record.get('source'), 'snapshot': record.get('snapshot'),
+                             'ts': record.get('ts'), 'records': []})
+        elif sessions and (last_seq is None or record['seq'] > last_seq):
+            # A crash between writing the history and resetting the journal
+            # folds the same records in twice; keep the first copy.
+            sessions[-1]['records'].append(record)
+        else:
+            continue
+        last_seq = record.get('seq', last_seq)
+    return sessions
+
+
+def restore_version(history_path: str, session: int = -1, upto_seq: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rebuild an earlier edited CSV from its history: the snapshot (or, for
+    sessions recorded without one, the source transcript) of `session`
+    with that session's changes up to `upto_seq` applied.
+    """
+    entry = read_history(history_path)[session]
+    if entry['snapshot'] is not None:
+        df = pd.read_csv(io.StringIO(entry['snapshot']))
+    else:
+        df = pd.read_csv(entry['source'])
+    for record in entry['records']:
+        if upto_seq is not None and record['seq'] > upto_seq:
+            break
+        df = apply_change(df, record)
+    return df
+
+
+class ChangeJournal:
+    """
+    Append-only log of the changes made to an edited CSV.
+
+    Each change is one JSON line with a sequence number, the editor's
+    initials and a timestamp. Lines are flushed immediately but fsync'd
+    only every `sync_every` records or `sync_interval` seconds. `compact`
+    writes the full CSV atomically and starts a fresh journal on top of
+    it, which is the only time the CSV itself is rewritten.
+
+    The journal is thread-safe: `compact` may run on a background writer
+    with a `mark` taken when the frame was snapshotted, while the UI keeps
+    appending; changes made after the mark carry over into the new journal.
+
+    With a `history_path`, the changes folded into the CSV by each
+    compaction are appended there instead of being discarded, so earlier
+    versions can be rebuilt with `restore_version` without keeping full
+    copies of the CSV. An existing CSV that the history does not describe
+    yet (one written before histories were kept) is copied into it as a
+    snapshot session before it is first overwritten.
+    """
+
+    def __init__(self, path: str, sync_every: int = 20, sync_interval: float = 2.0,
+                 history_path: Optional[str] = None):
+        self.path = path
+        self.history_path = history_path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        records = read_records(path)
+        self._seq = max((r.get('seq', 0) for r in records), default=0)
+        self._tail = [r for r in records if r.get('op') not in ('base', 'checkpoint')]
+        self._file = open(path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._history_checked = history_path is None
+        self._csv_path = None
+
+    def _timestamp(self):
+        return datetime.now().isoformat(timespec='seconds')
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=_json_default) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+
+    def append(self, op: str, row: Optional[int] = None, values=None, editor: Optional[str] = None):
+        with self._lock:
+            self._seq += 1
+            record = {
+                'seq': self._seq,
+                'ts': self._timestamp(),
+                'editor': editor,
+                'op': op,
+                'row': row,
+                'values': values,
+            }
+            self._write(record)
+            self._tail.append(record)
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.sync()
+
+    def mark(self) -> int:
+        """Sequence number of the last change appended so far."""
+        with self._lock:
+            return self._seq
+
+    def sync(self):
+        with self._lock:
+            if self._unsynced:
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def compact(self, df: pd.DataFrame, csv_path: str, mark: Optional[int] = None):
+        """
+        Write `df` (which holds every change up to `mark`) to `csv_path` and
+        restart the journal on top of it.
+        """
+        if mark is None:
+            mark = self.mark()
+        self._preserve_unrecorded(csv_path)
+        tmp_path, digest = _write_tmp_csv(df, csv_path)
+        with self._lock:
+            self._write({'seq': mark, 'ts': self._timestamp(), 'op': 'checkpoint', 'digest': digest})
+            self.sync()
+        _fsync_replace(tmp_path, csv_path)
+        self.reset(digest, mark)
+        self._csv_path = csv_path
+
+    def start_session(self, source_path: str):
+        """
+        Record in the history that the CSV was restarted from `source_path`.
+
+        The session's changes apply to the frame last compacted, not to the
+        raw source: the editors add columns such as quality_check_label
+        before the first compaction. That CSV is therefore stored as the
+        session's snapshot so `restore_version` starts from the same frame.
+        """
+        with self._lock:
+            record = {'seq': self._seq, 'ts': self._timestamp(), 'op': 'session',
+                      'source': os.path.abspath(source_path)}
+            if self.history_path is not None and self._csv_path is not None:
+                with open(self._csv_path, encoding='utf-8') as f:
+                    record['snapshot'] = f.read()
+            self._append_history([record])
+
+    def _preserve_unrecorded(self, csv_path):
+        # Only the first compaction needs to check: afterwards the history
+        # holds a session for whatever the CSV contains.
+        with self._lock:
+            if self._history_checked:
+                return
+            self._history_checked = True
+            if not os.path.exists(csv_path) or read_history(self.history_path):
+                return
+            with open(csv_path, encoding='utf-8') as f:
+                snapshot = f.read()
+            # Journal records the CSV already contains must not be replayed
+            # on top of the snapshot; read_history skips seqs up to this one.
+            pending = pending_changes(csv_path, read_records(self.path))
+            contained = pending[0]['seq'] - 1 if pending else self._seq
+            self._append_history([{'seq': contained, 'ts': self._timestamp(), 'op': 'session',
+                                   'source': os.path.abspath(csv_path), 'snapshot': snapshot}])
+
+    def _append_history(self, records):
+        if self.history_path is None or not records:
+            return
+        with open(self.history_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=_json_default) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self, digest: str, mark: Optional[int] = None):
+        with self._lock:
+            if mark is None:
+                mark = self._seq
+            self._append_history([r for r in self._tail if r['seq'] <= mark])
+            self._tail = [r for r in self._tail if r['seq'] > mark]
+            self._file.close()
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'seq': mark, 'ts': self._timestamp(), 'op': 'base', 'digest': digest}) + '\n')
+                for record in self._tail:
+                    f.write(json.dumps(record, default=_json_default) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_replace(tmp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            self._file.close()
@@ -0,0 +1,102 @@
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import types
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def module_available(name: str) -> bool:
+    """Whether the top-level package of `name` is installed, without importing it."""
+    try:
+        return importlib.util.find_spec(name.partition('.')[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__dict__['_lazy_target'])
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> Optional[types.ModuleType]:
+    """
+    Return a module whose import is deferred until it is first used, or
+    None when its package is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if not module_available(name):
+        return None
+    return LazyModule(name)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], object]:
+    """
+    Module `__getattr__` (PEP 562) for `package` that imports each name in
+    `exports` from its submodule on first access, so importing one light
+    submodule does not load the heavy ones the package re-exports.
+    """
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(exports[name], package), name)
+
+    return __getattr__
+
+
+def preload(*names: str) -> threading.Thread:
+    """
+    Import `names` on a background thread, for instance while a dialog
+    waits for the user. Errors are left for the eventual real import to
+    raise on the caller's thread.
+    """
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name='preload', daemon=True)
+    thread.start()
+    return thread
+
+
+def import_times(module: str, top: int = 10) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Import `module` in a fresh interpreter with `-X importtime` and return
+    its cumulative import time in seconds, with the `top` slowest imports
+    it pulled in.
+    """
+    import subprocess
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    total, rows = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        seconds = int(cumulative) / 1e6
+        if name.strip() == module:
+            total = seconds
+        else:
+            rows.append((seconds, name.strip()))
+    rows.sort(reverse=True)
+    return total, rows[:top]
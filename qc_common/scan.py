@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+AUDIO_EXTENSIONS = {'.wav'}
+CSV_EXTENSIONS = {'.csv'}
+TEXT_EXTENSIONS = {'.txt'}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'qc_launcher', 'scan_cache.json')
+
+# Directories changed this recently may still change within the same mtime
+# tick, so their listing is not trusted on the next run.
+RACY_SECONDS = 2.0
+
+
+def _list_dir(path):
+    """One scandir pass: what the directory holds and its subdirectories."""
+    info = {'wav': False, 'csv': None, 'txt': False, 'image': None, 'dirs': []}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        info['dirs'].append(entry.name)
+                        continue
+                except OSError:
+                    continue
+                ext = os.path.splitext(entry.name)[1].lower()
+                if ext in AUDIO_EXTENSIONS:
+                    info['wav'] = True
+                elif ext in CSV_EXTENSIONS:
+                    if info['csv'] is None or entry.name < info['csv']:
+                        info['csv'] = entry.name
+                elif ext in TEXT_EXTENSIONS:
+                    info['txt'] = True
+                elif ext in IMAGE_EXTENSIONS:
+                    if info['image'] is None or entry.name < info['image']:
+                        info['image'] = entry.name
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        pass
+    info['dirs'].sort()
+    return info
+
+
+class ScanSummary:
+    """
+    What a directory tree holds, as far as QC mode detection cares: whether
+    there is any WAV or text file, and the first CSV and image in sorted
+    top-down order.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.wav = False
+        self.txt = False
+        self.csv = None
+        self.image = None
+        self._csv_key = None
+        self._image_key = None
+        self.complete = False
+
+    def add(self, path, info):
+        rel = os.path.relpath(path, self.root)
+        key = [] if rel == os.curdir else rel.split(os.sep)
+        self.wav = self.wav or info['wav']
+        self.txt = self.txt or info['txt']
+        if info['csv'] is not None and (self._csv_key is None or (key, info['csv']) < self._csv_key):
+            self._csv_key, self.csv = (key, info['csv']), os.path.join(path, info['csv'])
+        if info['image'] is not None and (self._image_key is None or (key, info['image']) < self._image_key):
+            self._image_key, self.image = (key, info['image']), os.path.join(path, info['image'])
+
+
+class DirectoryScanner:
+    """
+    Classify the files under a directory in a single `os.scandir` pass per
+    directory, stopping as soon as `done(summary)` is true.
+
+    Each directory's listing is cached with its mtime; a directory whose
+    mtime is unchanged since the last run is not listed again, which on a
+    network share turns a full walk into one stat per directory. With
+    `workers` > 1, subdirectories are listed concurrently.
+    """
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH, workers: int = 1):
+        self.cache_path = cache_path
+        self.workers = workers
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding='utf-8') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+
+    def _info(self, path):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return _list_dir(path)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None and cached['mtime_ns'] == mtime_ns:
+            return cached['info']
+        info = _list_dir(path)
+        if time.time() - mtime_ns / 1e9 > RACY_SECONDS:
+            with self._lock:
+                self._cache[path] = {'mtime_ns': mtime_ns, 'info': info}
+                self._dirty = True
+        return info
+
+    def scan(self, root: str, done: Optional[Callable[[ScanSummary], bool]] = None) -> ScanSummary:
+        root = os.path.abspath(root)
+        summary = ScanSummary(root)
+        done = done or (lambda s: False)
+        if self.workers > 1:
+            self._scan_parallel(root, summary, done)
+        else:
+            stack = [root]
+            while stack and not done(summary):
+                path = stack.pop()
+                info = self._info(path)
+                summary.add(path, info)
+                stack.extend(os.path.join(path, d) for d in reversed(info['dirs']))
+            summary.complete = not stack
+        self.save()
+        return summary
+
+    def _scan_parallel(self, root, summary, done):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scan') as pool:
+            pending = {pool.submit(self._info, root): root}
+            while pending and not done(summary):
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path = pending.pop(future)
+                    info = future.result()
+                    summary.add(path, info)
+                    for d in info['dirs']:
+                        child = os.path.join(path, d)
+                        pending[pool.submit(self._info, child)] = child
+            summary.complete = not pending
+            for future in pending:
+                future.cancel()
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._cache, f)
+                self._dirty = False
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not save scan cache: {e}")
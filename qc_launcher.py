@@ -3,11 +3,21 @@ import os
 import sys
 import subprocess
 from typing import Tuple, Optional
-import tkinter as tk
-from tkinter import filedialog
 
+from qc_common.scan import DEFAULT_CACHE_PATH, DirectoryScanner
 
-def detect_qc_mode(source_dir: str) -> Tuple[str, Optional[str], Optional[str]]:
+# Modules timed by --import-times, roughly in the order a session loads them
+STARTUP_MODULES = [
+    'qc_launcher',
+    'transcription_qc.ravlt_scoring',
+    'transcription_qc.audio_player_app',
+    'image_qc.qc_tkinter',
+    'image_qc.data_editor_tk',
+]
+
+
+def detect_qc_mode(source_dir: str, workers: int = 1,
+                   cache_path: Optional[str] = DEFAULT_CACHE_PATH) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Detect QC mode from contents of source_dir.
 
@@ -15,48 +25,45 @@ def detect_qc_mode(source_dir: str) -> Tuple[str, Optional[str], Optional[str]]:
     - mode: 'audio', 'image', or 'unknown'
     - For audio: (csv_dir, None) — expects CSVs with transcripts and corresponding WAVs
     - For image: (csv_path, image_dir)
-    """
-    # Collect files
-    all_files = []
-    for root, _, files in os.walk(source_dir):
-        for f in files:
-            all_files.append(os.path.join(root, f))
 
-    lower = [f.lower() for f in all_files]
-
-    wavs = [f for f in all_files if f.lower().endswith('.wav')]
-    csvs = [f for f in all_files if f.lower().endswith('.csv')]
-    txts = [f for f in all_files if f.lower().endswith('.txt')]
-    images = [f for f in all_files if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'))]
+    The tree is scanned with `DirectoryScanner`: `workers` > 1 lists
+    subdirectories in parallel, and `cache_path` (None to disable) keeps
+    each directory's listing keyed by its mtime between runs.
+    """
+    # Audio is decided as soon as any WAV and any CSV have been seen; image
+    # mode needs the whole tree to rule audio out.
+    scanner = DirectoryScanner(cache_path, workers)
+    summary = scanner.scan(source_dir, done=lambda s: s.wav and s.csv is not None)
 
     # Heuristic: audio if we see wav + csvs that look like transcripts
-    if wavs and csvs:
-        # Prefer a directory that contains the transcript CSVs
+    if summary.wav and summary.csv:
         # The existing audio app prompts for a folder and looks for CSVs with "Recall" in name
-        # so we pass the source_dir to let user pick via GUI, or a detected transcripts dir
+        # so we pass the source_dir to let user pick via GUI
         return 'audio', source_dir, None
 
     # Heuristic: image QC if images + a CSV (metadata/ocr) exist
-    if images and (csvs or txts):
-        # Existing image PyQt5 app expects: csv_path and image_dir
-        # Choose the first CSV we find within the source_dir
-        csv_path = next((c for c in csvs), None)
-        # Choose an image directory: use the parent directory of first image if under source_dir
-        if images:
-            image_dir = os.path.dirname(images[0])
-        else:
-            image_dir = source_dir
-        return 'image', csv_path, image_dir
+    if summary.image and (summary.csv or summary.txt):
+        # Existing image app expects: csv_path and image_dir
+        # Use the first CSV and the directory of the first image, in sorted top-down order
+        return 'image', summary.csv, os.path.dirname(summary.image)
 
     return 'unknown', None, None
 
 
-def launch_audio_gui(csv_dir: str) -> int:
+def launch_audio_gui(csv_dir: str, in_process: bool = True) -> int:
     """
     Launch the existing Tkinter audio QC tool.
     The script `ravlt_scoring.py` opens a folder dialog by default.
     We simply run it; user will pick the appropriate folder if needed.
+
+    By default the GUI runs in this interpreter, which saves starting a
+    second Python and re-importing everything; `in_process=False` runs the
+    script in a child process instead.
     """
+    if in_process:
+        from transcription_qc.ravlt_scoring import main as audio_main
+        audio_main()
+        return 0
     # New package name: transcription_qc
     script_path = os.path.join(os.path.dirname(__file__), 'transcription_qc', 'ravlt_scoring.py')
     if not os.path.exists(script_path):
@@ -66,7 +73,7 @@ def launch_audio_gui(csv_dir: str) -> int:
     return subprocess.call([sys.executable, script_path])
 
 
-def launch_image_gui(csv_path: str, image_dir: str, prefer_pyqt5: bool = True) -> int:
+def launch_image_gui(csv_path: str, image_dir: str, prefer_pyqt5: bool = True, in_process: bool = True) -> int:
     """
     Launch the existing image QC GUI. Prefer PyQt5 version if available.
     The PyQt5 script normally prompts for paths via UI; we will provide them by
@@ -93,22 +100,60 @@ def launch_image_gui(csv_path: str, image_dir: str, prefer_pyqt5: bool = True) -
         return 1
 
     # Both scripts open file dialogs themselves; just run and let user pick
+    if in_process and target == tk_script:
+        from image_qc.qc_tkinter import main as image_main
+        image_main()
+        return 0
     return subprocess.call([sys.executable, target])
 
+
+def print_import_times(modules=STARTUP_MODULES, top: int = 5):
+    """Report how long each module takes to import in a fresh interpreter."""
+    from qc_common.lazy import import_times
+    for module in modules:
+        try:
+            total, slowest = import_times(module, top)
+        except RuntimeError as e:
+            print(e)
+            continue
+        print(f"{module}: {total * 1000:.0f} ms")
+        for seconds, name in slowest:
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+
 def main():
     parser = argparse.ArgumentParser(description='Unified QC launcher')
     parser.add_argument('--source', help='Path to source directory containing data to QC')
     parser.add_argument('--prefer-tk', action='store_true', default=True,
                         help='Prefer Tkinter image GUI instead of PyQt5')
+    parser.add_argument('--scan-workers', type=int, default=1,
+                        help='Threads used to scan the source directory (useful on network shares)')
+    parser.add_argument('--no-scan-cache', action='store_true',
+                        help='Ignore and do not update the cached directory listings')
+    parser.add_argument('--pre-qc', action='store_true',
+                        help='Flag suspect transcript rows without opening a GUI (audio only)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --pre-qc (default: CPU count)')
+    parser.add_argument('--subprocess', action='store_true',
+                        help='Run the QC GUI in a separate Python process')
+    parser.add_argument('--import-times', action='store_true',
+                        help='Report the import time of the launcher and each GUI, then exit')
     args = parser.parse_args()
 
+    if args.import_times:
+        print_import_times()
+        sys.exit(0)
+
     # If no source is given, prompt the user with a directory selection dialog
     if args.source:
         source_dir = os.path.abspath(args.source)
     else:
+        # Tk is only needed for this dialog, so it is not imported up front
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()  # Hide the main Tk window
         source_dir = filedialog.askdirectory(title="Select source directory for QC")
+        root.destroy()
         if not source_dir:
             print("No source directory selected. Exiting.")
             sys.exit(1)
@@ -118,17 +163,27 @@ def main():
         print(f"Source is not a directory: {source_dir}")
         sys.exit(2)
 
-    mode, primary, secondary = detect_qc_mode(source_dir)
+    mode, primary, secondary = detect_qc_mode(source_dir, args.scan_workers,
+                                              None if args.no_scan_cache else DEFAULT_CACHE_PATH)
     print(f"Detected mode: {mode}")
 
+    if args.pre_qc:
+        if mode != 'audio':
+            print('Pre-QC only applies to audio transcripts.')
+            sys.exit(3)
+        from transcription_qc.pre_qc import run_pre_qc
+        run_pre_qc(primary or source_dir, args.workers)
+        sys.exit(0)
+
     if mode == 'audio':
-        rc = launch_audio_gui(primary or source_dir)
+        rc = launch_audio_gui(primary or source_dir, in_process=not args.subprocess)
         sys.exit(rc)
     elif mode == 'image':
         prefer_pyqt5 = not args.prefer_tk
         rc = launch_image_gui(primary or source_dir,
                               secondary or source_dir,
-                              prefer_pyqt5=prefer_pyqt5)
+                              prefer_pyqt5=prefer_pyqt5,
+                              in_process=not args.subprocess)
         sys.exit(rc)
     else:
         print('Unable to infer QC mode from directory contents. Expected either:')
@@ -0,0 +1,151 @@
+import gc
+import os
+import struct
+import weakref
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from transcription_qc import audio_io
+from transcription_qc.audio_io import AudioCache, LazyAudio, probe_wav, to_float32
+
+
+@pytest.mark.parametrize('dtype', [np.int16, np.int32, np.float32, np.uint8])
+def test_probe_matches_scipy(tmp_path, dtype):
+    path = str(tmp_path / 'tone.wav')
+    data = (np.arange(3000).reshape(1500, 2) % 100).astype(dtype)
+    wavfile.write(path, 16000, data)
+
+    info = probe_wav(path)
+    rate, decoded = wavfile.read(path)
+    assert (info.sample_rate, info.channels, info.frames) == (rate, 2, 1500)
+    assert info.dtype == decoded.dtype
+    assert info.duration == pytest.approx(1500 / 16000)
+
+
+def write_raw_wav(path, chunks, data_size, payload):
+    body = b'WAVE' + b''.join(chunks) + b'data' + struct.pack('<I', data_size) + payload
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def fmt_chunk(tag=1, channels=1, rate=8000, bits=16):
+    block_align = channels * bits // 8
+    return b'fmt ' + struct.pack('<IHHIIHH', 16, tag, channels, rate, rate * block_align, block_align, bits)
+
+
+def test_probe_skips_unknown_chunks_and_clamps_streamed_size(tmp_path):
+    path = str(tmp_path / 'streamed.wav')
+    # An odd-sized LIST chunk is padded; the data size was never filled in
+    write_raw_wav(path, [b'LIST' + struct.pack('<I', 3) + b'abc\x00', fmt_chunk()], 0xFFFFFFFF, b'\x00' * 200)
+
+    info = probe_wav(path)
+    assert info.frames == 100 and info.dtype == np.dtype('<i2')
+    with open(path, 'rb') as f:
+        f.seek(info.data_offset - 8)
+        assert f.read(4) == b'data'
+
+
+def test_probe_rejects_non_wav_and_unsupported_formats(tmp_path):
+    path = str(tmp_path / 'bad.wav')
+    with open(path, 'wb') as f:
+        f.write(b'RIFX' + b'\x00' * 40)
+    with pytest.raises(ValueError):
+        probe_wav(path)
+
+    write_raw_wav(path, [fmt_chunk(tag=2)], 4, b'\x00' * 4)
+    with pytest.raises(ValueError):
+        probe_wav(path)
+
+
+def write_tone(path, frames, rate=8000):
+    wavfile.write(str(path), rate, (np.sin(np.arange(frames) / 5) * 20000).astype(np.int16))
+    return str(path)
+
+
+def test_eviction_releases_derived_products(tmp_path):
+    # Each decoded file is 4 * 50000 bytes; the budget holds one
+    cache = AudioCache(max_bytes=300000, mmap_threshold=None)
+    alive = []
+    for i in range(4):
+        path = write_tone(tmp_path / f'rec{i}.wav', 50000)
+        rate, audio = cache.get(path)
+        # Like SpectrogramTiles, the derived object keeps the audio
+        cache.derived(path, 'spectrogram', lambda: {'audio': audio})
+        alive.append(weakref.ref(audio))
+        del audio
+    gc.collect()
+
+    assert len(cache._entries) == 1
+    assert [ref() is not None for ref in alive] == [False, False, False, True]
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    # Each decoded file is 4 * 10000 bytes; the budget holds two
+    cache = AudioCache(max_bytes=90000, mmap_threshold=None)
+    a, b, c = (write_tone(tmp_path / f'{name}.wav', 10000) for name in 'abc')
+    first = cache.get(a)
+    cache.get(b)
+    assert cache.get(a) is first
+    cache.get(c)
+
+    assert cache.contains(a) and cache.contains(c) and not cache.contains(b)
+    assert cache.nbytes == 80000
+
+
+def test_cache_decodes_again_after_file_changes(tmp_path):
+    cache = AudioCache(mmap_threshold=None)
+    path = write_tone(tmp_path / 'rec.wav', 10000)
+    _, before = cache.get(path)
+    assert cache.info(path).frames == 10000
+
+    write_tone(path, 20000)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    rate, after = cache.get(path)
+
+    assert len(after) == 20000 and after is not before
+    assert cache.info(path).frames == 20000
+    assert cache.nbytes == after.nbytes and len(cache._entries) == 1
+
+
+
+def test_large_files_are_mapped_without_charge(tmp_path):
+    cache = AudioCache(max_bytes=1, mmap_threshold=0)
+    path = write_tone(tmp_path / 'rec.wav', 10000)
+    _, audio = cache.get(path)
+
+    assert isinstance(audio, LazyAudio) and len(audio) == 10000
+    assert cache.nbytes == 0 and cache.decoded_size(path) == 0
+
+
+def test_to_float32_normalises_and_downmixes():
+    unsigned = np.array([0, 128, 255], dtype=np.uint8)
+    assert to_float32(unsigned).tolist() == pytest.approx([-1.0, 0.0, 127 / 128])
+
+    stereo = np.array([[32767, -32767], [32767, 32767]], dtype=np.int16)
+    mono = to_float32(stereo)
+    assert mono.dtype == np.float32 and mono.tolist() == pytest.approx([0.0, 1.0])
+
+
+def test_chunked_downmix_matches_single_pass(monkeypatch):
+    stereo = (np.arange(2000).reshape(1000, 2) * 37 % 65536 - 32768).astype(np.int16)
+    expected = to_float32(stereo)
+    monkeypatch.setattr(audio_io, 'CONVERT_CHUNK_FRAMES', 64)
+
+    np.testing.assert_array_equal(to_float32(stereo), expected)
+
+
+def test_lazy_audio_converts_slices_on_access():
+    raw = (np.arange(600).reshape(300, 2) * 50).astype(np.int16)
+    audio = LazyAudio(raw)
+    expected = to_float32(raw)
+
+    assert len(audio) == 300 and audio.channels == 2 and audio.nbytes == 0
+    np.testing.assert_array_equal(audio[10:20], expected[10:20])
+    assert audio[-1] == expected[-1]
+    np.testing.assert_array_equal(np.asarray(audio), expected)
+    chunks = list(audio.iter_chunks(128))
+    assert [start for start, _ in chunks] == [0, 128, 256]
+    np.testing.assert_array_equal(np.concatenate([chunk for _, chunk in chunks]), expected)
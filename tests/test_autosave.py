@@ -0,0 +1,80 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from qc_common.autosave import AutosaveWriter
+
+
+class RecordingWriter:
+    def __init__(self, block=None):
+        self.calls = []
+        self.block = block
+
+    def __call__(self, df, path):
+        if self.block is not None:
+            self.block.wait(5)
+        self.calls.append((path, df['value'].tolist()))
+
+
+def frame(value):
+    return pd.DataFrame({'value': [value]})
+
+
+def test_submissions_for_a_path_are_coalesced():
+    write = RecordingWriter()
+    writer = AutosaveWriter(delay=60)
+    for value in range(5):
+        writer.submit('a.csv', frame(value), write=write)
+    writer.submit('b.csv', frame(9), write=write)
+    assert write.calls == []
+
+    assert writer.flush(timeout=5)
+    assert sorted(write.calls) == [('a.csv', [4]), ('b.csv', [9])]
+    writer.close(timeout=5)
+
+
+def test_submit_snapshots_the_frame():
+    write = RecordingWriter()
+    writer = AutosaveWriter(delay=60)
+    df = frame(1)
+    writer.submit('a.csv', df, write=write)
+    df.loc[0, 'value'] = 2
+    writer.close(timeout=5)
+    assert write.calls == [('a.csv', [1])]
+
+
+def test_flush_waits_for_a_write_in_progress():
+    release = threading.Event()
+    write = RecordingWriter(block=release)
+    writer = AutosaveWriter(delay=0)
+    writer.submit('a.csv', frame(1), write=write)
+    assert not writer.flush(timeout=0.2)
+    release.set()
+    assert writer.flush(timeout=5)
+    assert write.calls == [('a.csv', [1])]
+    writer.close(timeout=5)
+
+
+def test_then_runs_after_write_and_errors_are_kept():
+    done = []
+    writer = AutosaveWriter(delay=0)
+    writer.submit('a.csv', frame(1), write=RecordingWriter(), then=lambda: done.append(True))
+
+    def fail(df, path):
+        raise OSError('disk full')
+
+    writer.submit('b.csv', frame(2), write=fail, then=lambda: done.append(False))
+    writer.close(timeout=5)
+    assert done == [True]
+    assert isinstance(writer.last_error, OSError)
+
+
+def test_close_writes_pending_and_rejects_new_work(tmp_path):
+    path = str(tmp_path / 'edited.csv')
+    writer = AutosaveWriter(delay=60)
+    writer.submit(path, frame(3))
+    writer.close(timeout=5)
+    assert pd.read_csv(path)['value'].tolist() == [3]
+    with pytest.raises(RuntimeError):
+        writer.submit(path, frame(4))
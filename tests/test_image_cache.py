@@ -0,0 +1,89 @@
+import pytest
+from PIL import Image
+
+from image_qc import image_cache
+from image_qc.image_cache import ImageCache, decode_image, decode_region, fit_size
+from image_qc.thumbnail_store import ThumbnailStore, thumbnail_folder_for
+
+
+class FakePhoto:
+    # PhotoImage needs a Tk root; the cache only stores and returns it
+    def __init__(self, image):
+        self.size = image.size
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(image_cache.ImageTk, 'PhotoImage', FakePhoto)
+    cache = ImageCache(size=(100, 100), capacity=2)
+    yield cache
+    cache.shutdown()
+
+
+def write_image(path, size=(800, 400), color='red'):
+    Image.new('RGB', size, color).save(path)
+    return str(path)
+
+
+def wait(cache):
+    for future in list(cache._futures.values()):
+        future.result(timeout=5)
+    cache.collect()
+
+
+def test_fit_size_keeps_aspect_ratio():
+    assert fit_size((800, 400), (100, 100)) == (100, 50)
+    assert fit_size((10, 1000), (100, 100)) == (1, 100)
+
+
+def test_decode_image_scales_jpeg_to_fit(tmp_path):
+    path = write_image(tmp_path / 'page.jpg', (1600, 1200))
+    assert decode_image(path, (400, 400)).size == (400, 300)
+
+
+def test_decode_image_reads_smallest_sufficient_tiff_level(tmp_path):
+    path = str(tmp_path / 'pyramid.tif')
+    levels = [Image.new('RGB', (1600 // 2 ** k, 800 // 2 ** k), color)
+              for k, color in enumerate(['red', 'lime', 'blue'])]
+    levels[0].save(path, save_all=True, append_images=levels[1:])
+
+    # A 400x200 target is covered by level 2; 600x300 needs level 1
+    assert decode_image(path, (400, 400)).getpixel((0, 0)) == (0, 0, 255)
+    assert decode_image(path, (600, 600)).getpixel((0, 0)) == (0, 255, 0)
+
+
+def test_decode_region_crops_full_resolution(tmp_path):
+    path = write_image(tmp_path / 'page.png')
+    assert decode_region(path, (10, 20, 110, 70)).size == (100, 50)
+
+
+def test_prefetched_images_are_hits_and_capacity_is_kept(cache, tmp_path):
+    paths = [write_image(tmp_path / f'page{i}.png') for i in range(3)]
+    cache.schedule(paths[:2])
+    wait(cache)
+
+    assert cache.photo(paths[0]).size == (100, 50)
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.schedule(paths[2:])
+    wait(cache)
+    # paths[1] was least recently used
+    assert set(cache._photos) == {paths[0], paths[2]}
+    assert cache.photo(paths[1]) is not None and cache.misses == 1
+
+
+def test_missing_image_and_resize(cache, tmp_path):
+    assert cache.photo(str(tmp_path / 'missing.png')) is None
+
+    path = write_image(tmp_path / 'page.png')
+    cache.photo(path)
+    cache.set_size((200, 200))
+    assert not cache._photos and cache.photo(path).size == (200, 100)
+
+
+def test_images_are_scaled_from_thumbnail_store(cache, tmp_path):
+    path = write_image(tmp_path / 'page.png')
+    store = ThumbnailStore(thumbnail_folder_for(str(tmp_path)), size=(400, 400))
+    cache.store = store
+
+    assert cache.photo(path).size == (100, 50)
+    assert store.get(path).size == (400, 200)
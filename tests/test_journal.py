@@ -0,0 +1,221 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qc_common import journal as journal_module
+from qc_common.journal import (ChangeJournal, history_path_for, journal_path_for, pending_changes, read_history,
+                               read_records, recover, restore_version, write_csv_atomic)
+
+
+@pytest.fixture
+def transcript():
+    return pd.DataFrame({
+        'onset': [0.5, 1.25, 2.0],
+        'offset': [1.0, 1.75, 2.5],
+        'word': ['apple', 'river', 'drum'],
+        'quality_check_label': [np.nan] * 3,
+    })
+
+
+@pytest.fixture
+def edited(tmp_path, transcript):
+    path = str(tmp_path / 'S1_Recall_edited_file.csv')
+    write_csv_atomic(transcript, path)
+    journal = ChangeJournal(journal_path_for(path))
+    journal.compact(transcript, path)
+    yield path, journal
+    journal.close()
+
+
+def test_recover_replays_changes_on_base(edited):
+    path, journal = edited
+    journal.append('set', 0, {'quality_check_label': 'accept'}, editor='AB')
+    journal.append('insert', 1, [1.1, 1.2, 'pear', 'review'], editor='AB')
+    journal.append('drop', 3, editor='AB')
+    journal.close()
+
+    df = recover(path)
+    assert df['word'].tolist() == ['apple', 'pear', 'river']
+    assert df.loc[0, 'quality_check_label'] == 'accept'
+    assert df.loc[1, 'quality_check_label'] == 'review'
+
+
+def test_recover_ignores_truncated_last_line(edited):
+    path, journal = edited
+    journal.append('set', 2, {'word': 'drums'})
+    journal.close()
+    with open(journal_path_for(path), 'a', encoding='utf-8') as f:
+        f.write('{"seq": 3, "op": "se')
+
+    assert recover(path)['word'].tolist() == ['apple', 'river', 'drums']
+
+
+def test_crash_between_checkpoint_and_rename_replays_everything(edited, monkeypatch, transcript):
+    path, journal = edited
+    journal.append('set', 0, {'quality_check_label': 'accept'})
+    df = recover(path)
+
+    def crash(tmp_path, path):
+        raise OSError('power cut')
+
+    monkeypatch.setattr(journal_module, '_fsync_replace', crash)
+    with pytest.raises(OSError):
+        journal.compact(df, path)
+    journal.close()
+
+    # The checkpoint is in the journal, but the CSV on disk is still the base
+    assert read_records(journal_path_for(path))[-1]['op'] == 'checkpoint'
+    recovered = recover(path)
+    assert recovered.loc[0, 'quality_check_label'] == 'accept'
+    assert recovered['word'].tolist() == transcript['word'].tolist()
+
+
+def test_crash_between_rename_and_reset_skips_folded_changes(edited, monkeypatch):
+    path, journal = edited
+    journal.append('insert', 0, [0.1, 0.2, 'egg', 'accept'])
+    df = recover(path)
+
+    def crash(*args, **kwargs):
+        raise OSError('power cut')
+
+    monkeypatch.setattr(ChangeJournal, 'reset', crash)
+    with pytest.raises(OSError):
+        journal.compact(df, path)
+    monkeypatch.undo()
+    journal.append('set', 1, {'quality_check_label': 'review'})
+    journal.close()
+
+    # The CSV already holds the insert; only the later change is pending
+    records = read_records(journal_path_for(path))
+    assert [r['op'] for r in pending_changes(path, records)] == ['set']
+    recovered = recover(path)
+    assert recovered['word'].tolist() == ['egg', 'apple', 'river', 'drum']
+    assert recovered.loc[1, 'quality_check_label'] == 'review'
+
+
+def test_unknown_csv_is_not_replayed_onto(edited, transcript):
+    path, journal = edited
+    journal.append('drop', 0)
+    journal.close()
+    write_csv_atomic(transcript.iloc[:1], path)
+
+    assert pending_changes(path, read_records(journal_path_for(path))) == []
+    assert len(recover(path)) == 1
+
+
+def test_compact_carries_changes_after_mark(edited):
+    path, journal = edited
+    journal.append('set', 0, {'quality_check_label': 'accept'})
+    snapshot, mark = recover(path), journal.mark()
+    # Made while the snapshot is being written on another thread
+    journal.append('set', 1, {'quality_check_label': 'review'})
+    journal.compact(snapshot, path, mark)
+    journal.close()
+
+    on_disk = pd.read_csv(path)
+    assert on_disk.loc[0, 'quality_check_label'] == 'accept'
+    assert pd.isna(on_disk.loc[1, 'quality_check_label'])
+    records = read_records(journal_path_for(path))
+    assert records[0]['op'] == 'base' and records[0]['seq'] == mark
+    assert [r['seq'] for r in pending_changes(path, records)] == [mark + 1]
+    assert recover(path).loc[1, 'quality_check_label'] == 'review'
+
+
+def test_journal_lines_are_plain_json(edited):
+    path, journal = edited
+    journal.append('set', np.int64(2), {'onset': np.float64(2.5)}, editor='AB')
+    journal.close()
+    with open(journal_path_for(path), encoding='utf-8') as f:
+        last = json.loads(f.readlines()[-1])
+    assert last['row'] == 2 and last['values'] == {'onset': 2.5} and last['editor'] == 'AB'
+
+
+def _session(tmp_path, name, df):
+    path = str(tmp_path / name)
+    write_csv_atomic(df, path)
+    return path
+
+
+def test_restore_version_rebuilds_each_session(tmp_path, transcript):
+    source = _session(tmp_path, 'S1_Recall.csv', transcript)
+    path = str(tmp_path / 'S1_Recall_edited_file.csv')
+    history = history_path_for(path)
+
+    journal = ChangeJournal(journal_path_for(path), history_path=history)
+    journal.compact(transcript, path)
+    journal.start_session(source)
+    journal.append('set', 0, {'quality_check_label': 'accept'})
+    first_seq = journal.mark()
+    journal.append('set', 1, {'quality_check_label': 'review'})
+    journal.compact(recover(path), path)
+    journal.close()
+
+    # A second session starts over from the transcript
+    journal = ChangeJournal(journal_path_for(path), history_path=history)
+    journal.compact(transcript, path)
+    journal.start_session(source)
+    journal.append('drop', 2)
+    journal.close()
+    journal = ChangeJournal(journal_path_for(path), history_path=history)
+    journal.compact(recover(path), path)
+    journal.close()
+
+    sessions = read_history(history)
+    assert [len(s['records']) for s in sessions] == [2, 1]
+    first = restore_version(history, 0)
+    assert first['quality_check_label'].tolist()[:2] == ['accept', 'review']
+    partial = restore_version(history, 0, upto_seq=first_seq)
+    assert partial.loc[0, 'quality_check_label'] == 'accept'
+    assert pd.isna(partial.loc[1, 'quality_check_label'])
+    assert restore_version(history)['word'].tolist() == ['apple', 'river']
+
+
+def test_unrecorded_edited_csv_is_snapshotted_before_overwrite(tmp_path, transcript):
+    source = _session(tmp_path, 'S1_Recall.csv', transcript)
+    earlier = transcript.copy()
+    earlier['quality_check_label'] = ['accept', 'review', 'accept']
+    # An edited CSV from before histories were kept, with a pending change
+    path = _session(tmp_path, 'S1_Recall_edited_file.csv', earlier)
+    journal = ChangeJournal(journal_path_for(path))
+    journal.compact(earlier, path)
+    journal.append('set', 2, {'word': 'drums'})
+    journal.close()
+
+    history = history_path_for(path)
+    journal = ChangeJournal(journal_path_for(path), history_path=history)
+    journal.compact(transcript, path)
+    journal.start_session(source)
+    journal.close()
+
+    sessions = read_history(history)
+    assert sessions[0]['snapshot'] is not None and len(sessions[0]['records']) == 1
+    restored = restore_version(history, 0)
+    assert restored['quality_check_label'].tolist() == ['accept', 'review', 'accept']
+    assert restored['word'].tolist() == ['apple', 'river', 'drums']
+    assert pd.read_csv(path)['quality_check_label'].isna().all()
+
+
+def test_restore_version_starts_from_prepared_frame(tmp_path, transcript):
+    raw = transcript.drop(columns=['quality_check_label'])
+    source = _session(tmp_path, 'S1_Recall.csv', raw)
+    path = str(tmp_path / 'S1_Recall_edited_file.csv')
+    history = history_path_for(path)
+    # The editor adds its columns before the first compaction
+    prepared = raw.copy()
+    prepared['quality_check_label'] = np.nan
+    prepared['note'] = np.nan
+
+    journal = ChangeJournal(journal_path_for(path), history_path=history)
+    journal.compact(prepared, path)
+    journal.start_session(source)
+    journal.append('insert', 1, [1.1, 1.2, 'pear', 'review', 'check'])
+    journal.append('row', 0, [0.4, 1.0, 'apples', 'accept', 'ok'])
+    journal.compact(recover(path), path)
+    journal.close()
+
+    restored = restore_version(history)
+    pd.testing.assert_frame_equal(restored, pd.read_csv(path), check_dtype=False)
+    assert restored.loc[0, 'note'] == 'ok'
+    assert restored['word'].tolist() == ['apples', 'pear', 'river', 'drum']
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from transcription_qc.onset_snap import BoundaryDetector
+
+RATE = 8000
+
+
+def recording():
+    # Background noise, a voiced word at 0.5-1.0 s and a quiet fricative
+    # (noise 9 dB above the background) at 1.5-1.8 s
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 1e-3, 2 * RATE).astype(np.float32)
+    t = np.arange(RATE // 2) / RATE
+    audio[RATE // 2:RATE] += 0.3 * np.sin(2 * np.pi * 220 * t)
+    audio[int(1.5 * RATE):int(1.8 * RATE)] += rng.normal(0, 2e-3, int(0.3 * RATE))
+    return audio
+
+
+def test_boundaries_follow_voiced_and_fricative_regions():
+    detector = BoundaryDetector.build(recording(), RATE)
+
+    assert detector.onsets == pytest.approx([0.5, 1.5], abs=0.02)
+    assert detector.offsets == pytest.approx([1.0, 1.8], abs=0.02)
+    assert detector.active[detector.frame_at([0.75, 1.65])].all()
+    assert not detector.active[detector.frame_at([0.2, 1.25])].any()
+
+
+def test_chunked_build_matches_single_pass():
+    audio = recording()
+    whole = BoundaryDetector.build(audio, RATE)
+    chunked = BoundaryDetector.build(audio, RATE, chunk_frames=7)
+
+    np.testing.assert_allclose(chunked.energy_db, whole.energy_db, rtol=1e-5)
+    np.testing.assert_array_equal(chunked.onsets, whole.onsets)
+    np.testing.assert_array_equal(chunked.offsets, whole.offsets)
+
+
+def test_snap_picks_nearest_boundary_within_tolerance():
+    detector = BoundaryDetector(np.array([0.5, 1.5]), np.array([1.0, 1.8]), np.zeros(1), np.zeros(1),
+                                np.zeros(1, dtype=bool), hop=0.01, frame=0.02)
+
+    assert detector.snap(0.95, 0.1) == 1.0
+    assert detector.snap(0.95, 0.1, kind='onset') == 0.95
+    assert detector.snap(1.45, 0.1, kind='onset') == 1.5
+    assert detector.snap(1.3, 0.1) == 1.3
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from transcription_qc.onset_snap import BoundaryDetector
+from transcription_qc.pre_qc import find_transcripts, flag_rows
+
+
+def detector(active_ranges, frames=500, hop=0.01, frame=0.02):
+    active = np.zeros(frames, dtype=bool)
+    for start, stop in active_ranges:
+        active[start:stop] = True
+    empty = np.empty(0)
+    return BoundaryDetector(empty, empty, np.zeros(frames), np.zeros(frames), active, hop, frame)
+
+
+@pytest.fixture
+def flags():
+    df = pd.DataFrame({
+        'onset': [1.0, 2.0, 1.2, 4.5],
+        'offset': [1.5, 2.4, 1.4, 4.5],
+        'word': ['apple', 'river', 'pear', 'drum'],
+        'confidence': [0.9, 0.9, 0.3, 0.9],
+    })
+    # Speech at 1.0-1.5 s (covered), 3.0-3.6 s (not covered) and a 0.1 s blip
+    return flag_rows(df, detector([(99, 150), (299, 360), (420, 430)]))
+
+
+def reasons(flags, word):
+    row = flags.loc[flags['word'] == word].iloc[0]
+    return row['candidate'], set(filter(None, row['reason'].split(';')))
+
+
+def test_clean_row_is_accepted(flags):
+    assert reasons(flags, 'apple') == ('accept', set())
+
+
+def test_suspect_rows_are_flagged_with_reasons(flags):
+    assert reasons(flags, 'river') == ('for_review', {'silent'})
+    assert reasons(flags, 'pear') == ('for_review', {'low_confidence', 'overlap'})
+    assert reasons(flags, 'drum') == ('for_review', {'zero_length'})
+
+
+def test_untranscribed_speech_is_added_in_onset_order(flags):
+    gaps = flags[flags['row'] == -1]
+    assert len(gaps) == 1
+    assert gaps.iloc[0]['onset'] == pytest.approx(3.0, abs=0.02)
+    assert gaps.iloc[0]['offset'] == pytest.approx(3.6, abs=0.02)
+    assert flags['onset'].is_monotonic_increasing
+    assert sorted(flags.loc[flags['row'] >= 0, 'row']) == [0, 1, 2, 3]
+
+
+def test_find_transcripts_skips_tool_outputs(tmp_path):
+    for rel in ['audio_transcripts/S1_Recall_words.csv', 'audio_transcripts/S1_other.csv',
+                'audio_transcripts/pre_qc/S1_Recall_words.csv', 'edited/S1_Recall_words_edited_file.csv',
+                'audio_transcripts/S2_Recall_words_edited_file.csv']:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('onset\n')
+    assert find_transcripts(str(tmp_path)) == [os.path.join(str(tmp_path), 'audio_transcripts', 'S1_Recall_words.csv')]
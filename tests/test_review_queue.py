@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from transcription_qc.review_queue import ReviewQueue
+
+
+def transcript(labels, confidence=None):
+    df = pd.DataFrame({'quality_check_label': pd.Series(labels, dtype=object)})
+    df['confidence'] = confidence if confidence is not None else [0.5] * len(labels)
+    return df
+
+
+def test_next_skips_labelled_rows():
+    queue = ReviewQueue(transcript([np.nan, 'accept', 'accept', np.nan, 'review']))
+    assert len(queue) == 2
+    assert queue.next(0) == 0
+    assert queue.next(1) == 3
+    assert queue.next(4) is None
+    assert queue.next(-5) == 0 and queue.next(99) is None
+
+
+def test_mark_reviewed_removes_rows_once():
+    queue = ReviewQueue(transcript([np.nan] * 4))
+    queue.mark_reviewed(1)
+    queue.mark_reviewed(1)
+    queue.mark_reviewed(2)
+    assert len(queue) == 2
+    assert queue.next(1) == 3
+    queue.mark_reviewed(3)
+    assert queue.next(1) is None
+    assert queue.next(0) == 0
+
+
+def test_min_confidence_treats_confident_rows_as_reviewed():
+    df = transcript([np.nan] * 4, confidence=[0.99, 0.2, 'n/a', 0.95])
+    queue = ReviewQueue(df, min_confidence=0.9)
+    assert [queue.next(row) for row in range(4)] == [1, 1, 2, None]
+
+
+def test_rebuild_picks_up_new_labels():
+    df = transcript([np.nan] * 3)
+    queue = ReviewQueue(df)
+    df.loc[0, 'quality_check_label'] = 'accept'
+    queue.rebuild(df)
+    assert queue.next(0) == 1 and len(queue) == 2
+
+
+def test_long_reviewed_run_is_skipped_in_one_step():
+    labels = ['accept'] * 200000 + [np.nan]
+    queue = ReviewQueue(transcript(labels))
+    assert queue.next(0) == 200000
@@ -0,0 +1,69 @@
+import os
+
+from qc_common.scan import DirectoryScanner
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w'):
+        pass
+
+
+def age(path, seconds=60):
+    # Directories modified just now are not trusted by the cache
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+def test_summary_finds_first_csv_and_image_in_sorted_order(tmp_path):
+    root = str(tmp_path)
+    touch(os.path.join(root, 'b', 'page2.png'))
+    touch(os.path.join(root, 'a', 'z', 'page1.jpg'))
+    touch(os.path.join(root, 'a', 'ocr.csv'))
+    touch(os.path.join(root, 'notes.txt'))
+
+    summary = DirectoryScanner(cache_path=None).scan(root)
+    assert summary.complete and summary.txt and not summary.wav
+    assert summary.csv == os.path.join(root, 'a', 'ocr.csv')
+    assert summary.image == os.path.join(root, 'a', 'z', 'page1.jpg')
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    root = str(tmp_path)
+    for i in range(6):
+        touch(os.path.join(root, f'd{i}', f'sub{i}', f'img{i}.tif'))
+    touch(os.path.join(root, 'd3', 'meta.csv'))
+
+    serial = DirectoryScanner(cache_path=None).scan(root)
+    parallel = DirectoryScanner(cache_path=None, workers=4).scan(root)
+    assert (parallel.csv, parallel.image, parallel.complete) == (serial.csv, serial.image, True)
+
+
+def test_scan_stops_once_done(tmp_path):
+    root = str(tmp_path)
+    touch(os.path.join(root, 'a', 'x.wav'))
+    touch(os.path.join(root, 'a', 'x.csv'))
+    touch(os.path.join(root, 'b', 'y.wav'))
+
+    summary = DirectoryScanner(cache_path=None).scan(root, done=lambda s: s.wav and s.csv is not None)
+    assert summary.wav and not summary.complete
+
+
+def test_cache_is_reused_until_a_directory_changes(tmp_path):
+    root = str(tmp_path / 'data')
+    cache = str(tmp_path / 'cache' / 'scan.json')
+    touch(os.path.join(root, 'rec.wav'))
+    age(root)
+
+    assert DirectoryScanner(cache).scan(root).wav
+    assert os.path.exists(cache)
+
+    # With the mtime put back, the cached listing is used as is
+    cached = os.stat(root)
+    os.remove(os.path.join(root, 'rec.wav'))
+    os.utime(root, ns=(cached.st_atime_ns, cached.st_mtime_ns))
+    assert DirectoryScanner(cache).scan(root).wav
+
+    # A changed mtime forces a fresh listing
+    age(root, 120)
+    assert not DirectoryScanner(cache).scan(root).wav
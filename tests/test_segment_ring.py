@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from transcription_qc.audio_io import LazyAudio
+from transcription_qc.segment_ring import SegmentRing
+
+
+@pytest.fixture
+def ring():
+    ring = SegmentRing(capacity=2)
+    yield ring
+    ring.shutdown()
+
+
+def wait(ring):
+    for future in ring._segments.values():
+        future.result(timeout=5)
+
+
+def test_prepared_segments_are_contiguous_float32_copies(ring):
+    raw = (np.arange(2000).reshape(1000, 2) * 10).astype(np.int16)
+    ring.reset(LazyAudio(raw))
+    ring.schedule([(100, 200), (300, 400)])
+    wait(ring)
+
+    segment = ring.get(100, 200)
+    assert segment.dtype == np.float32 and segment.flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(segment, LazyAudio(raw)[100:200])
+    assert (ring.hits, ring.misses) == (1, 0)
+
+
+def test_window_is_capped_and_moves_with_the_rows(ring):
+    ring.reset(np.zeros(1000, dtype=np.float32))
+    ring.schedule([(0, 10), (10, 20), (20, 30)])
+    wait(ring)
+    assert ring.get(20, 30) is None
+
+    ring.schedule([(10, 20), (20, 30)])
+    wait(ring)
+    assert ring.get(0, 10) is None
+    assert ring.get(10, 20) is not None and ring.get(20, 30) is not None
+    assert (ring.hits, ring.misses) == (2, 2)
+
+
+def test_reset_forgets_segments_of_the_previous_recording(ring):
+    ring.reset(np.ones(100, dtype=np.float32))
+    ring.schedule([(0, 10)])
+    wait(ring)
+    ring.reset(np.zeros(100, dtype=np.float32))
+
+    assert ring.get(0, 10) is None
+    ring.schedule([(0, 10)])
+    wait(ring)
+    assert not ring.get(0, 10).any()
@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from image_qc.thumbnail_store import ThumbnailStore, thumbnail_folder_for
+
+
+def write_image(path):
+    pixels = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_put_prunes_store_filled_by_earlier_sessions(tmp_path):
+    folder = thumbnail_folder_for(str(tmp_path))
+    # Identical pixels give equally sized thumbnails
+    paths = [write_image(str(tmp_path / f'page{i}.png')) for i in range(4)]
+    earlier = ThumbnailStore(folder, size=(64, 64))
+    sizes = [earlier.put(path, Image.open(path)) for path in paths[:3]]
+    for i, path in enumerate(paths[:3]):
+        thumb = earlier.path_for(earlier.key(path))
+        os.utime(thumb, (1000 + i, 1000 + i))
+
+    # A new session has not sized the store yet; its first put must
+    store = ThumbnailStore(folder, size=(64, 64), max_bytes=sum(sizes))
+    store.put(paths[3], Image.open(paths[3]))
+
+    assert store.get(paths[0]) is None
+    assert store.get(paths[2]) is not None and store.get(paths[3]) is not None
+    assert sum(size for _, size, _ in store._entries()) <= store.max_bytes
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from transcription_qc.transcript_index import TranscriptIndex
+
+
+def make_index(onsets, words):
+    return TranscriptIndex(pd.DataFrame({'onset': onsets, 'word': words}))
+
+
+def test_closest_picks_the_nearer_neighbour():
+    index = make_index([0.5, 1.0, 2.0], ['a', 'b', 'c'])
+    assert index.closest(0.0) == 0
+    assert index.closest(0.76) == 1
+    assert index.closest(0.75) == 0
+    assert index.closest(1.6) == 2
+    assert index.closest(9.0) == 2
+    assert make_index([], []).closest(1.0) == -1
+
+
+def test_find_word_is_case_insensitive_and_skips_missing_words():
+    index = make_index([0.5, 1.0, 2.0], ['Apple', None, 'apple'])
+    assert index.find_word('APPLE') == 0
+    assert index.find_word('pear') == -1
+
+
+def test_insert_and_remove_shift_word_rows():
+    index = make_index([0.5, 1.0, 2.0], ['a', 'b', 'c'])
+    index.insert(1, 'x', 0.7)
+    assert index.find_word('b') == 2 and index.find_word('x') == 1
+    assert index.onsets.tolist() == [0.5, 0.7, 1.0, 2.0]
+    index.remove(0)
+    assert index.find_word('a') == -1 and index.find_word('c') == 2
+    assert not index.needs_sort
+
+
+def test_update_relinks_word_and_flags_broken_order():
+    index = make_index([0.5, 1.0, 2.0], ['a', 'b', 'c'])
+    index.update(1, 'z', 1.5)
+    assert index.find_word('b') == -1 and index.find_word('z') == 1
+    assert not index.needs_sort
+    index.update(0, 'a', 3.0)
+    assert index.needs_sort
+    # Out of order, closest falls back to a linear search
+    assert index.closest(2.9) == 0
+
+
+def test_unsorted_input_needs_sort():
+    assert make_index([1.0, 0.5], ['a', 'b']).needs_sort
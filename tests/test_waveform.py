@@ -0,0 +1,46 @@
+import numpy as np
+from scipy.io import wavfile
+
+from transcription_qc.waveform import WaveformPyramid, load_or_build_pyramid
+
+
+def ramp(frames):
+    # A sawtooth: each block's min and max are known exactly
+    return ((np.arange(frames) % 1000) / 1000).astype(np.float32)
+
+
+def test_envelope_bounds_points_and_tracks_extremes():
+    audio = ramp(400000)
+    pyramid = WaveformPyramid.build(audio, 8000, block=100, factor=4, min_blocks=16)
+
+    x, y = pyramid.envelope(0, 50, max_points=500)
+    assert len(x) == len(y) <= 2 * 500 + 4
+    assert y.min() == audio.min() and y.max() == audio.max()
+
+    # A narrower window uses a finer level over the same range
+    x, y = pyramid.envelope(10, 11, max_points=500)
+    assert x[0] <= 10 and x[-1] >= 11 - pyramid.block_size(0) / 8000
+    assert np.all(np.diff(x) >= 0)
+
+
+def test_envelope_leaves_short_ranges_to_raw_samples():
+    pyramid = WaveformPyramid.build(ramp(8000), 8000)
+    assert pyramid.envelope(0.0, 0.1, max_points=500) is None
+
+
+def test_pyramid_is_cached_until_the_recording_changes(tmp_path):
+    wav_path = str(tmp_path / 'rec.wav')
+    audio = ramp(50000)
+    wavfile.write(wav_path, 8000, audio)
+    cache_dir = str(tmp_path / 'peaks')
+
+    built = load_or_build_pyramid(wav_path, audio, 8000, cache_dir=cache_dir)
+    loaded = load_or_build_pyramid(wav_path, audio, 8000, cache_dir=cache_dir)
+    assert loaded is not built
+    for (low, high), (cached_low, cached_high) in zip(built.levels, loaded.levels):
+        np.testing.assert_array_equal(low, cached_low)
+        np.testing.assert_array_equal(high, cached_high)
+
+    shorter = audio[:40000]
+    wavfile.write(wav_path, 8000, shorter)
+    assert load_or_build_pyramid(wav_path, shorter, 8000, cache_dir=cache_dir).frames == 40000
@@ -1,9 +1,11 @@
-from .initials import InitialsEntryApp
-from .audio_player_app import AudioPlayerApp
-
-__all__ = [
-    'InitialsEntryApp',
-    'AudioPlayerApp',
-]
+from qc_common.lazy import lazy_exports
 
+# Resolved on first access (PEP 562) so that importing a submodule does not
+# load the whole audio app and its matplotlib/pandas dependencies.
+_EXPORTS = {
+    'InitialsEntryApp': '.initials',
+    'AudioPlayerApp': '.audio_player_app',
+}
 
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_exports(__name__, _EXPORTS)
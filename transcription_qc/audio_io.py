@@ -0,0 +1,315 @@
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from qc_common.lazy import lazy_import
+
+# scipy.io pulls in most of scipy; only pay for it on the first decode.
+wavfile = lazy_import('scipy.io.wavfile')
+
+
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+DEFAULT_MMAP_THRESHOLD = 256 * 1024 * 1024
+CONVERT_CHUNK_FRAMES = 1 << 20
+
+
+def to_float32(audio_data: np.ndarray) -> np.ndarray:
+    """
+    Downmix to mono and normalise raw WAV samples to float32 in [-1, 1].
+    """
+    if audio_data.ndim > 1 and audio_data.shape[0] > CONVERT_CHUNK_FRAMES:
+        return _to_float32_chunked(audio_data)
+    return _convert(audio_data)
+
+
+def _convert(audio_data):
+    if np.issubdtype(audio_data.dtype, np.unsignedinteger):
+        info = np.iinfo(audio_data.dtype)
+        offset = (info.max + 1) // 2
+        audio_data = (audio_data.astype(np.float32) - offset) / offset
+    elif np.issubdtype(audio_data.dtype, np.integer):
+        audio_data = audio_data.astype(np.float32) / np.iinfo(audio_data.dtype).max
+    else:
+        audio_data = audio_data.astype(np.float32, copy=False)
+    if audio_data.ndim > 1:
+        audio_data = audio_data.mean(axis=1, dtype=np.float32)
+    return audio_data
+
+
+def _to_float32_chunked(audio_data):
+    # Converting a multichannel block in one go allocates a full float32
+    # copy per channel before downmixing; filling a mono buffer in chunks
+    # keeps the peak at the size of the result.
+    out = np.empty(audio_data.shape[0], dtype=np.float32)
+    for start in range(0, audio_data.shape[0], CONVERT_CHUNK_FRAMES):
+        stop = start + CONVERT_CHUNK_FRAMES
+        out[start:stop] = _convert(audio_data[start:stop])
+    return out
+
+
+class LazyAudio:
+    """
+    Mono float32 view over a memory-mapped WAV.
+
+    Samples stay in the page cache as raw PCM and are only converted and
+    downmixed for the frames that are sliced, so opening a multi-GB
+    recording does not grow the process by the size of the recording.
+    """
+
+    ndim = 1
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, raw: np.ndarray):
+        self.raw = raw
+
+    def __len__(self):
+        return self.raw.shape[0]
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def channels(self) -> int:
+        return 1 if self.raw.ndim == 1 else self.raw.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        # Pages are backed by the file and can be dropped by the OS at any
+        # time, so they are not charged against the decoded-audio budget.
+        return 0
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            index = range(len(self))[item]
+            return _convert(np.asarray(self.raw[index:index + 1]))[0]
+        return to_float32(np.asarray(self.raw[item]))
+
+    def __array__(self, dtype=None, copy=None):
+        data = to_float32(self.raw)
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def iter_chunks(self, chunk_frames: int = CONVERT_CHUNK_FRAMES):
+        for start in range(0, len(self), chunk_frames):
+            yield start, self[start:start + chunk_frames]
+
+
+def transcript_audio_path(csv_path: str) -> str:
+    """
+    Map a transcript CSV to its recording: `<name>_*.csv` pairs with
+    `<name>.wav` in the `audio_transcripts` folder two levels up.
+    """
+    parts = csv_path.split('/')
+    name = parts[-1].split('_')[0]
+    audio_list = f"{'/'.join(parts[:-1])}/{name}.wav".split('/')
+    audio_list[-3] = 'audio_transcripts'
+    return '/'.join(audio_list)
+
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    frames: int
+    dtype: np.dtype
+    data_offset: int
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+_PCM_DTYPES = {8: 'u1', 16: '<i2', 24: '<i4', 32: '<i4', 64: '<i8'}
+_FLOAT_DTYPES = {32: '<f4', 64: '<f8'}
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def probe_wav(file_path: str) -> WavInfo:
+    """
+    Read sample rate, channel count, frame count and sample dtype from the
+    RIFF header without touching the sample payload.
+
+    The dtype is the one `scipy.io.wavfile.read` returns (24-bit PCM is
+    widened to int32).
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError(f"Not a RIFF/WAVE file: {file_path}")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {file_path}")
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                body = f.read(size)
+                tag, channels, rate, _, block_align, bits = struct.unpack('<HHIIHH', body[:16])
+                if tag == _WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    tag = struct.unpack('<H', body[24:26])[0]
+                fmt = tag, channels, rate, block_align, bits
+                if size & 1:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"data chunk before fmt chunk in {file_path}")
+                tag, channels, rate, block_align, bits = fmt
+                data_offset = f.tell()
+                # Writers that stream to disk often leave the size unset or
+                # larger than the file; trust the file length in that case.
+                size = min(size, file_size - data_offset)
+                if tag == _WAVE_FORMAT_PCM and bits in _PCM_DTYPES:
+                    dtype = np.dtype(_PCM_DTYPES[bits])
+                elif tag == _WAVE_FORMAT_IEEE_FLOAT and bits in _FLOAT_DTYPES:
+                    dtype = np.dtype(_FLOAT_DTYPES[bits])
+                else:
+                    raise ValueError(f"Unsupported WAV format {tag:#x}/{bits}-bit in {file_path}")
+                return WavInfo(rate, channels, size // block_align, dtype, data_offset)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def decode_wav(file_path: str, mmap: bool = False) -> Tuple[int, np.ndarray]:
+    if mmap:
+        try:
+            sample_rate, raw = wavfile.read(file_path, mmap=True)
+        except ValueError:
+            # scipy cannot map 24-bit PCM; fall back to a full decode
+            pass
+        else:
+            return sample_rate, LazyAudio(raw)
+    sample_rate, audio_data = wavfile.read(file_path)
+    return sample_rate, to_float32(audio_data)
+
+
+class AudioCache:
+    """
+    Decoded-audio cache shared by loading, playback and duration lookups.
+
+    Entries are keyed by (absolute path, mtime) so an edited recording is
+    decoded again, and the least recently used recordings are evicted once
+    the decoded arrays exceed `max_bytes`. Files larger than
+    `mmap_threshold` bytes are opened as a memory-mapped `LazyAudio` view
+    instead of being decoded (0 maps every file, None never maps).
+
+    `info` returns the header-only `WavInfo` for a file and is cached the
+    same way, so duration lookups never read the sample payload. `derived`
+    keeps products computed from the audio (waveform envelopes and the
+    like) under the same key, so they are dropped when the file changes or
+    its audio is evicted.
+
+    The cache may be shared with worker threads; decoding happens outside
+    the lock, so a background load never stalls a lookup on the UI thread.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES,
+                 mmap_threshold: Optional[int] = DEFAULT_MMAP_THRESHOLD):
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._info = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(file_path):
+        path = os.path.abspath(file_path)
+        return path, os.stat(path).st_mtime_ns
+
+    def get(self, file_path: str) -> Tuple[int, np.ndarray]:
+        key = self._key(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = decode_wav(key[0], mmap=self._use_mmap(key[0]))
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            self._drop_stale(key)
+            self._entries[key] = entry
+            self._nbytes += entry[1].nbytes
+            self._evict(keep=key)
+        return entry
+
+    def contains(self, file_path: str) -> bool:
+        key = self._key(file_path)
+        with self._lock:
+            return key in self._entries
+
+    def info(self, file_path: str) -> WavInfo:
+        key = self._key(file_path)
+        with self._lock:
+            info = self._info.get(key)
+        if info is None:
+            info = probe_wav(key[0])
+            with self._lock:
+                self._drop_stale(key)
+                info = self._info.setdefault(key, info)
+        return info
+
+    def derived(self, file_path: str, name: str, build: Callable):
+        key = self._key(file_path)
+        with self._lock:
+            value = self._derived.get((key, name))
+        if value is None:
+            value = build()
+            with self._lock:
+                self._drop_stale(key)
+                value = self._derived.setdefault((key, name), value)
+        return value
+
+    def decoded_size(self, file_path: str) -> int:
+        """Bytes `get` would add to the cache for this file."""
+        path = os.path.abspath(file_path)
+        if self._use_mmap(path):
+            return 0
+        return self.info(path).frames * np.dtype(np.float32).itemsize
+
+    def _use_mmap(self, path):
+        if self.mmap_threshold is None:
+            return False
+        return os.path.getsize(path) >= self.mmap_threshold
+
+    def discard(self, file_path: str):
+        with self._lock:
+            self._drop_stale((os.path.abspath(file_path), None))
+
+    def _drop_stale(self, key):
+        for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+            self._nbytes -= self._entries.pop(stale)[1].nbytes
+        for stale in [k for k in self._info if k[0] == key[0] and k != key]:
+            del self._info[stale]
+        for stale in [k for k in self._derived if k[0][0] == key[0] and k[0] != key]:
+            del self._derived[stale]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._info.clear()
+            self._derived.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def _evict(self, keep):
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            self._nbytes -= self._entries.pop(key)[1].nbytes
+            # Derived products such as spectrogram tiles may hold the decoded
+            # array; keeping them would keep the evicted audio alive.
+            for derived in [k for k in self._derived if k[0] == key]:
+                del self._derived[derived]
@@ -1,31 +1,38 @@
 import tkinter as tk
 from tkinter import filedialog, simpledialog, ttk, messagebox
 import os
+import time
 import pandas as pd
 import numpy as np
-import time
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
 import matplotlib
 matplotlib.use('Agg')
+
+from qc_common.autosave import AutosaveWriter
+from qc_common.journal import ChangeJournal, history_path_for, journal_path_for, recover
+from qc_common.lazy import module_available
+
+from .audio_io import AudioCache
+from .blit import set_span
+from .button_states import DISABLED, NORMAL, ButtonStates
+from .onset_snap import BoundaryDetector
+from .playback import PlaybackEngine
+from .pre_qc import load_flagged_onsets
+from .prefetch import Prefetcher, load_file_audio, prepare_file
+from .review_queue import ReviewQueue
+from .segment_ring import SegmentRing
+from .spectrogram import SpectrogramTiles
+from .transcript_index import TranscriptIndex
+from .transcript_view import TranscriptView
+from .waveform_view import WaveformView
+
+# Playback needs scipy (WAV decoding) and sounddevice; both are imported
+# lazily by audio_io and playback, so only check that they are installed.
 AUDIO_ENABLED = True
 
-try:
-    import pygame
-except ImportError:
-    print('pygame import error')
-    AUDIO_ENABLED = False
-try:
-    from scipy.io import wavfile
-except ImportError:
-    print('scipy import error')
-    AUDIO_ENABLED = False
-try:
-    import sounddevice as sd
-except ImportError:
-    print('sounddevice import error')
-    AUDIO_ENABLED = False
+for _module in ('scipy', 'sounddevice'):
+    if not module_available(_module):
+        print(f'{_module} import error')
+        AUDIO_ENABLED = False
 
 
 class AudioPlayerApp:
@@ -64,9 +71,37 @@ class AudioPlayerApp:
         self.edited_folder = 'edited'
         os.makedirs(self.edited_folder, exist_ok=True)
 
-        pygame.mixer.init()
+        self.audio_cache = AudioCache()
+        self.plot_points = 4000
+        # Waveform envelopes are cached under ~/.cache, never next to the WAVs
+        self.persist_waveform = True
+        self.view = None
+        self.prefetcher = Prefetcher(self.audio_cache, depth=1, persist_waveform=self.persist_waveform)
+        self.player = PlaybackEngine()
+        self.cursor_fps = 30
+        self.segments = SegmentRing(capacity=8)
+        self.log_latency = False
+        self.snap_tolerance = 0.1
+        self.flagged_onsets = []
+        self.flagged_position = 0
+        self.review_min_confidence = None
+        self.resumed = False
+        self.key_actions = {
+            'a': 'accept', 'r': 'review', 'o': 'off_task', 'n': 'add_note',
+            'space': 'play_current', 'Right': 'next_row', 'j': 'next_row', 'f': 'next_flagged',
+            's': 'start', 'w': 'whole_audio', 'e': 'start_edit', 'i': 'start_insert', 'd': 'drop',
+        }
+        self.auto_play_after = ('accept', 'review', 'off_task', 'add_note', 'next_row', 'next_flagged', 'start')
+        self.cursor_job = None
+        self.journal = None
+        self.autosave = AutosaveWriter()
+        # Every change is already durable in the journal, so the edited CSV
+        # is only rewritten this often while editing, then on switch/exit.
+        self.autosave_interval = 60.0
+        self.autosave_job = None
 
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         self.csv_frame = ttk.Frame(self.root)
@@ -78,6 +113,7 @@ class AudioPlayerApp:
         scrollbar_y = ttk.Scrollbar(self.csv_frame, command=self.csv_text.yview)
         scrollbar_y.pack(side="right", fill="y")
         self.csv_text["yscrollcommand"] = scrollbar_y.set
+        self.transcript = TranscriptView(self.csv_text)
 
         self.canvas_placeholder = tk.Canvas(self.root, width=400, height=300, bg="white")
         self.canvas_placeholder.grid(row=0, column=2)
@@ -142,6 +178,16 @@ class AudioPlayerApp:
         self.save_insert_button = tk.Button(self.root, text="Save Insert", state=tk.DISABLED, command=lambda: self.mark_edit_label('insert', 'insert'), bg='blue')
         self.save_insert_button.grid(row=8, column=1, padx=0)
 
+        self.show_spectrogram = tk.BooleanVar(value=False)
+        self.spectrogram_button = tk.Checkbutton(self.root, text="Spectrogram", variable=self.show_spectrogram,
+                                                 command=self.toggle_spectrogram)
+        self.spectrogram_button.grid(row=9, column=1, padx=0)
+
+        self.snap_enabled = tk.BooleanVar(value=False)
+        self.snap_button = tk.Checkbutton(self.root, text="Snap to Boundaries", variable=self.snap_enabled,
+                                          command=self.boundaries)
+        self.snap_button.grid(row=10, column=1, padx=0)
+
         self.space = tk.StringVar()
         self.space.set('Quality Check')
         self.label_display_2 = tk.Label(self.root, textvariable=self.space)
@@ -168,6 +214,49 @@ class AudioPlayerApp:
         self.play_current_audio = tk.Button(self.root, text="Play Current Audio", command=self.play_audio_segment)
         self.play_current_audio.grid(row=8, column=2, padx=10, pady=0)
 
+        self.next_flagged_button = tk.Button(self.root, text="Next Flagged", command=self.next_flagged, state=tk.DISABLED)
+        self.next_flagged_button.grid(row=9, column=2, padx=10)
+
+        self.skip_reviewed = tk.BooleanVar(value=False)
+        self.skip_reviewed_button = tk.Checkbutton(self.root, text="Skip Reviewed Rows", variable=self.skip_reviewed)
+        self.skip_reviewed_button.grid(row=10, column=2, padx=10)
+
+        self.keyboard_mode = tk.BooleanVar(value=False)
+        self.keyboard_mode_button = tk.Checkbutton(self.root, text="Keyboard Mode", variable=self.keyboard_mode)
+        self.keyboard_mode_button.grid(row=11, column=1, padx=0)
+        self.root.bind('<Key>', self.on_key)
+
+        buttons = {name: getattr(self, f'{name}_button') for name in (
+            'start', 'restart', 'next_row', 'next_file', 'refresh', 'import', 'whole_audio', 'zoom_in', 'zoom_out',
+            'start_edit', 'save_edit', 'drop', 'start_insert', 'save_insert', 'accept', 'review', 'off_task',
+            'add_note', 'search', 'next_flagged')}
+        buttons['play_current'] = self.play_current_audio
+        self.buttons = ButtonStates(buttons)
+
+    def flagged_button_state(self):
+        return NORMAL if len(self.flagged_onsets) else DISABLED
+
+    def on_key(self, event):
+        # Single keys press the matching button while keyboard mode is on,
+        # unless the reviewer is typing into an entry or the transcript.
+        # Labelling a row moves on to the next one, and every move plays the
+        # new row's segment straight away.
+        pressed = time.perf_counter()
+        if not self.keyboard_mode.get() or isinstance(event.widget, (tk.Entry, tk.Text)):
+            return
+        action = self.key_actions.get(event.keysym)
+        if action is None or not self.buttons.enabled(action):
+            return
+        if action == 'play_current':
+            self.play_audio_segment(pressed)
+            return 'break'
+        self.buttons.buttons[action].invoke()
+        if action in ('accept', 'review', 'off_task', 'add_note'):
+            self.next_playback()
+        if action in self.auto_play_after and self.buttons.enabled('accept'):
+            self.play_audio_segment(pressed)
+        return 'break'
+
     def open_popup(self, button_val):
         def get_text_and_continue():
             entered_text = entry_var.get()
@@ -175,10 +264,10 @@ class AudioPlayerApp:
             if button_val == 'search':
                 self.search_data(entered_text)
             elif button_val == 'insert':
-                self.next_row_button.config(state=tk.DISABLED)
+                self.buttons.apply('entering_text')
                 self.mark_edit_label(button_val, entered_text)
             else:
-                self.next_row_button.config(state=tk.DISABLED)
+                self.buttons.apply('entering_text')
                 self.mark_edit_label(button_val, entered_text)
             popup.destroy()
             self.root.update()
@@ -197,32 +286,27 @@ class AudioPlayerApp:
         continue_button.pack(pady=10)
 
     def display_csv(self):
-        self.csv_text.delete(1.0, "end")
-        csv_string = self.df.iloc[:, :].to_string(index=True)
-        lines = csv_string.split('\n')
-        for i, line in enumerate(lines, start=1):
-            if i == self.current_index + 2:
-                self.csv_text.insert("end", line + "\n", "highlight")
-            else:
-                self.csv_text.insert("end", line + "\n")
-        self.csv_text.tag_configure("highlight", background="yellow")
+        self.transcript.render(self.df, self.current_index)
+
+    def highlight_row(self):
+        self.transcript.set_highlight(self.current_index)
+
+    def sort_rows(self):
+        # Only re-sort when an edit or insert has put a row out of onset order.
+        if not self.transcript_index.needs_sort:
+            return False
+        self.df = self.df.sort_values('onset').reset_index(drop=True)
+        self.log_change('sort')
+        self.transcript_index = TranscriptIndex(self.df)
+        self.review_queue.rebuild(self.df)
+        self.display_csv()
+        return True
 
     def refresh(self):
-        self.df = self.df.sort_values('onset')
-        self.df = self.df.reset_index(drop=True)
-        self.display_csv()
+        if not self.sort_rows():
+            self.highlight_row()
         self.root.update()
 
-    def get_time_axis(self):
-        return np.linspace(0, self.audio_duration, len(self.audio_data))
-
-    def load_audio(self):
-        sample_rate, audio_data = wavfile.read(self.audio_file_path)
-        if len(audio_data.shape) > 1:
-            audio_data = np.mean(audio_data, axis=1)
-        audio_data = audio_data.astype(np.float32) / np.iinfo(audio_data.dtype).max
-        return audio_data
-
     def zoom_in(self):
         if self.zoom_count >= self.max_zoom_count:
             return
@@ -241,7 +325,7 @@ class AudioPlayerApp:
             new_max = cursor_position + new_x_range_length / 2
         self.x_range = (new_min, new_max)
         self.zoom_count += 1
-        self.ax.set_xlim(self.x_range)
+        self.view.set_xlim(self.x_range)
         self.canvas.draw()
 
     def zoom_out(self):
@@ -262,45 +346,68 @@ class AudioPlayerApp:
             new_max = cursor_position + new_x_range_length / 2
         self.x_range = (new_min, new_max)
         self.zoom_count -= 1
-        self.ax.set_xlim(self.x_range)
+        self.view.set_xlim(self.x_range)
         self.canvas.draw()
 
     def init_plot(self):
-        self.fig, self.ax = plt.subplots()
-        self.line, = self.ax.plot(self.get_time_axis(), self.audio_data)
-        self.red_cursor_line = self.ax.axvline(x=self.cursor_position, color='red', linestyle='-', linewidth=2)
-        self.green_cursor_line, = self.ax.plot([0, 0], [-1, 1], color='green', linestyle='-', linewidth=2, visible=False)
-        self.yellow_start_line = self.ax.axvline(x=self.start_section, color='yellow', linestyle='-', linewidth=1, visible=False)
-        self.red_highlight_space = plt.axvspan(self.start_section, self.end_section, color='red', alpha=0, label='Highlighted Area')
-        self.yellow_end_line = self.ax.axvline(x=self.end_section, color='yellow', linestyle='-', linewidth=1, visible=False)
-        self.blue_start_line = self.ax.axvline(x=self.start_section, color='blue', linestyle='-', linewidth=1, visible=False)
-        self.blue_highlight_space = plt.axvspan(self.start_section, self.end_section, color='blue', alpha=0, label='Insert Area', visible=False)
-        self.blue_end_line = self.ax.axvline(x=self.end_section, color='blue', linestyle='-', linewidth=1, visible=False)
-        self.ax.set_xlim(self.x_range)
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlabel('Time (seconds)')
-        self.ax.set_ylabel('Amplitude')
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
-        self.canvas_widget = self.canvas.get_tk_widget()
-        self.canvas_widget.grid(row=0, column=2, padx=10, pady=10)
+        if self.view is None:
+            self.view = WaveformView(self.root, self.plot_points)
+            self.view.widget.grid(row=0, column=2, padx=10, pady=10)
+            self.view.connect('motion_notify_event', self.on_motion)
+            self.view.connect('button_press_event', self.on_click)
+            self.fig, self.ax, self.canvas, self.canvas_widget = self.view.fig, self.view.ax, self.view.canvas, self.view.widget
+            self.blit, self.line = self.view.blit, self.view.line
+            self.red_cursor_line, self.green_cursor_line = self.view.red_cursor_line, self.view.green_cursor_line
+            self.yellow_start_line, self.yellow_end_line = self.view.yellow_start_line, self.view.yellow_end_line
+            self.blue_start_line, self.blue_end_line = self.view.blue_start_line, self.view.blue_end_line
+            self.red_highlight_space, self.blue_highlight_space = self.view.red_highlight_space, self.view.blue_highlight_space
+        self.view.set_data(self.audio_data, self.rate, self.waveform, self.x_range,
+                           self.cursor_position, self.start_section, self.end_section,
+                           self.spectrogram_tiles())
         return self.red_cursor_line, self.green_cursor_line
 
+    def spectrogram_tiles(self):
+        if not self.show_spectrogram.get():
+            return None
+        audio_data, rate = self.audio_data, self.rate
+        return self.audio_cache.derived(self.audio_file_path, 'spectrogram',
+                                        lambda: SpectrogramTiles(audio_data, rate))
+
+    def toggle_spectrogram(self):
+        if self.view is None:
+            return
+        self.view.set_spectrogram(self.spectrogram_tiles())
+        self.canvas.draw()
+
+    def boundaries(self):
+        if not self.snap_enabled.get() or self.view is None:
+            return None
+        audio_data, rate = self.audio_data, self.rate
+        return self.audio_cache.derived(self.audio_file_path, 'boundaries',
+                                        lambda: BoundaryDetector.build(audio_data, rate))
+
+    def snap(self, x, kind):
+        boundaries = self.boundaries()
+        if boundaries is None:
+            return x
+        return boundaries.snap(x, self.snap_tolerance, kind)
+
     def update_plot(self):
-        self.root.update()
+        self.root.update_idletasks()
         cursor_line_x = self.cursor_position
         self.red_cursor_line.set_xdata([cursor_line_x, cursor_line_x])
         self.yellow_start_line.set_visible(True)
         self.yellow_start_line.set_xdata([self.start_section, self.start_section])
-        self.red_highlight_space.remove()
-        self.red_highlight_space = plt.axvspan(self.start_section, self.end_section, color='red', alpha=0.3, label='Highlighted Area')
+        set_span(self.red_highlight_space, self.start_section, self.end_section)
+        self.red_highlight_space.set_alpha(0.3)
         self.yellow_end_line.set_visible(True)
         self.yellow_end_line.set_xdata([self.end_section, self.end_section])
         self.blue_start_line.set_xdata([self.insert_start_section, self.insert_start_section])
-        self.blue_highlight_space.remove()
-        self.blue_highlight_space = plt.axvspan(self.insert_start_section, self.insert_end_section, color='blue', alpha=0.3, label='Insert Area', visible=False)
+        set_span(self.blue_highlight_space, self.insert_start_section, self.insert_end_section)
+        self.blue_highlight_space.set_alpha(0.3)
         self.blue_end_line.set_xdata([self.insert_end_section, self.insert_end_section])
         self.green_cursor_line.set_xdata([self.mouse_position, self.mouse_position])
-        self.canvas.draw()
+        self.blit.update()
         return self.red_cursor_line, self.green_cursor_line
 
     def on_motion(self, event):
@@ -311,12 +418,12 @@ class AudioPlayerApp:
             self.green_cursor_line.set_visible(True)
         else:
             self.green_cursor_line.set_visible(False)
-        self.canvas.draw()
+        self.blit.update()
 
     def on_click(self, event):
         if event.xdata is not None:
             if self.onset_position != None:
-                self.offset_position = event.xdata
+                self.offset_position = self.snap(event.xdata, 'offset')
                 if self.edit:
                     self.end_section = self.offset_position
                 if self.insert:
@@ -327,7 +434,7 @@ class AudioPlayerApp:
                 self.root.update()
                 print(f"Clicked at time: {self.offset_position} seconds")
             else:
-                self.onset_position = event.xdata
+                self.onset_position = self.snap(event.xdata, 'onset')
                 if self.edit:
                     self.start_section = self.onset_position
                 if self.insert:
@@ -339,23 +446,9 @@ class AudioPlayerApp:
 
     def restart(self):
         self.current_index = 0
-        self.start_button.config(state=tk.NORMAL)
-        self.refresh_button.config(state=tk.DISABLED)
-        self.start_insert_button.config(state=tk.DISABLED)
-        self.save_insert_button.config(state=tk.DISABLED)
-        self.restart_button.config(state=tk.NORMAL)
-        self.next_row_button.config(state=tk.DISABLED)
-        self.next_file_button.config(state=tk.NORMAL)
-        self.accept_button.config(state=tk.DISABLED)
-        self.start_edit_button.config(state=tk.DISABLED)
-        self.save_edit_button.config(state=tk.DISABLED)
-        self.drop_button.config(state=tk.DISABLED)
-        self.review_button.config(state=tk.DISABLED)
-        self.off_task_button.config(state=tk.DISABLED)
-        self.add_note_button.config(state=tk.NORMAL)
-        self.off_task_button.config(state=tk.NORMAL)
+        self.buttons.apply('restarted')
         self.word = ''
-        self.display_csv()
+        self.highlight_row()
         self.label_text.set(self.word)
 
     def search_data(self, search_query):
@@ -367,140 +460,120 @@ class AudioPlayerApp:
 
     def display_info_and_play_audio(self, index):
         if 0 <= index < len(self.df):
-            self.start_button.config(state=tk.DISABLED)
             self.start_showing_text = True
-            self.restart_button.config(state=tk.NORMAL)
-            self.next_row_button.config(state=tk.NORMAL)
-            self.next_file_button.config(state=tk.NORMAL)
-            self.refresh_button.config(state=tk.NORMAL)
-            self.accept_button.config(state=tk.NORMAL)
-            self.start_edit_button.config(state=tk.NORMAL)
-            self.save_edit_button.config(state=tk.DISABLED)
-            self.review_button.config(state=tk.NORMAL)
-            self.off_task_button.config(state=tk.NORMAL)
-            self.add_note_button.config(state=tk.NORMAL)
-            self.off_task_button.config(state=tk.NORMAL)
-            self.start_insert_button.config(state=tk.NORMAL)
-            self.save_insert_button.config(state=tk.DISABLED)
-            self.drop_button.config(state=tk.NORMAL)
-            self.root.update()
+            self.buttons.apply('reviewing', next_flagged=self.flagged_button_state())
             self.search_result_label.config(text="")
             self.current_index = index
             self.get_audio_segment()
-            self.current_index -= 1
-            self.next_playback()
+            self.next_playback(index)
         else:
             self.search_result_label.config(text="Please check spelling/submitted Start Time.")
 
+    def next_flagged(self):
+        # Flags are kept by onset, so rows inserted or dropped since the
+        # pre-QC pass do not shift them onto the wrong word.
+        if self.flagged_position >= len(self.flagged_onsets):
+            self.flagged_position = 0
+            self.search_result_label.config(text="No more flagged rows; starting over.")
+            return
+        onset = self.flagged_onsets[self.flagged_position]
+        self.flagged_position += 1
+        self.display_info_and_play_audio(self.find_closest_time(onset))
+
     def find_matching_word(self, search_word):
-        matching_rows = self.df[self.df['word'].str.lower().eq(search_word)]
-        if not matching_rows.empty:
-            return matching_rows.index[0]
-        else:
-            return -1
+        return self.transcript_index.find_word(search_word)
 
     def find_closest_time(self, search_time):
-        closest_index = np.argmin(np.abs(self.df['onset'] - search_time).values)
-        return closest_index
+        return self.transcript_index.closest(search_time)
 
     def get_audio_duration(self, file_path):
-        sample_rate, audio_data = wavfile.read(file_path)
-        duration = len(audio_data) / sample_rate
-        return duration * 1000
-
-    def update_cursor_position(self, sample_rate, total_samples):
-        start_time_sec = self.start_time / 1000
-        end_time_sec = self.end_time / 1000
-        duration_sec = end_time_sec - start_time_sec
-
-        start_ticks = time.time()
-        while time.time() - start_ticks < duration_sec:
-            elapsed_sec = time.time() - start_ticks
-            self.cursor_position = start_time_sec + elapsed_sec
-            self.red_cursor_line.set_xdata([self.cursor_position, self.cursor_position])
-            self.canvas.draw()
-            self.root.update()
-            time.sleep(0.01)  # small delay to animate smoothly
+        return self.audio_cache.info(file_path).duration * 1000
 
     def play_full_audio(self):
         try:
-            sample_rate, audio_data = wavfile.read(self.audio_file_path)
-            if audio_data.ndim > 1:
-                audio_data = np.mean(audio_data, axis=1)
-            audio_data = audio_data.astype(np.float32) / np.iinfo(audio_data.dtype).max
+            sample_rate, audio_data = self.audio_cache.get(self.audio_file_path)
 
             self.start_time = 0
             self.end_time = len(audio_data) / sample_rate * 1000
             self.cursor_position = 0
 
-            # Play asynchronously
-            sd.play(audio_data, sample_rate)
-            
-            # Start cursor animation
-            self.animate_cursor(self.start_time / 1000, self.end_time / 1000)
-            
+            self.player.play(audio_data, sample_rate)
+            self.animate_cursor()
+
         except Exception as e:
             print(f"Error playing full audio: {e}")
 
-    def animate_cursor(self, start_sec, end_sec):
-        step = 0.01  # seconds
-        if self.cursor_position < end_sec:
-            self.red_cursor_line.set_xdata([self.cursor_position, self.cursor_position])
-            self.canvas.draw()
-            self.cursor_position += step
-            self.root.after(int(step*1000), lambda: self.animate_cursor(start_sec, end_sec))
-
-    def play_audio_segment(self):
+    def animate_cursor(self):
+        # Poll the position the audio device has actually played rather than
+        # advancing by a fixed step, so a slow redraw never makes it drift.
+        if self.cursor_job is not None:
+            self.root.after_cancel(self.cursor_job)
+            self.cursor_job = None
+        self.cursor_position = self.player.position
+        self.red_cursor_line.set_xdata([self.cursor_position, self.cursor_position])
+        self.blit.update()
+        if self.player.active:
+            self.cursor_job = self.root.after(int(1000 / self.cursor_fps), self.animate_cursor)
+        elif self.log_latency and self.player.last_latency is not None:
+            print(f"Press-to-audio latency: {self.player.last_latency * 1000:.1f} ms "
+                  f"(segments ready {self.segments.hits}, sliced on demand {self.segments.misses})")
+
+    def play_audio_segment(self, requested_at=None):
+        # The segment is normally already sliced by the segment ring; only
+        # fall back to playing a range of the full recording when it is not.
+        requested_at = requested_at or time.perf_counter()
         try:
-            sample_rate, audio_data = wavfile.read(self.audio_file_path)
-            if audio_data.ndim > 1:
-                audio_data = np.mean(audio_data, axis=1)
-            audio_data = audio_data.astype(np.float32) / np.iinfo(audio_data.dtype).max
-
-            start_sample = int(self.start_time * sample_rate / 1000)
-            end_sample = int(self.end_time * sample_rate / 1000)
-            segment = audio_data[start_sample:end_sample]
-
+            start_sample, end_sample = self.sample_range(self.start_time, self.end_time)
             self.cursor_position = self.start_time / 1000
 
-            sd.play(segment, sample_rate)
-            self.animate_cursor(self.start_time / 1000, self.end_time / 1000)
-            
+            segment = self.segments.get(start_sample, end_sample)
+            if segment is not None:
+                self.player.play(segment, self.rate, offset=start_sample / self.rate, requested_at=requested_at)
+            else:
+                sample_rate, audio_data = self.audio_cache.get(self.audio_file_path)
+                self.player.play(audio_data, sample_rate, start_sample, end_sample, requested_at=requested_at)
+            self.animate_cursor()
+
         except Exception as e:
             print(f"Error playing audio segment: {e}")
 
+    def sample_range(self, start_time, end_time):
+        start = max(0, int(start_time * self.rate / 1000))
+        return start, max(start, min(len(self.audio_data), int(end_time * self.rate / 1000)))
+
+    def upcoming_segments(self):
+        # Sample ranges of the current row and the rows Next Row will visit
+        # after it, computed the same way get_audio_segment does.
+        ranges, row = [], self.current_index
+        while 0 <= row < len(self.df) and len(ranges) < self.segments.capacity:
+            onset, offset = self.df.iloc[row, 1], self.df.iloc[row, 2]
+            if pd.notna(onset) and pd.notna(offset):
+                ranges.append(self.sample_range(onset * 1000 - 500, offset * 1000 + 2000))
+            row = self.next_row(row)
+        return ranges
+
     def start_playback(self):
         self.label_text.set('')
-        self.start_button.config(state=tk.DISABLED)
         self.start_showing_text = True
-        self.restart_button.config(state=tk.NORMAL)
-        self.next_row_button.config(state=tk.NORMAL)
-        self.next_file_button.config(state=tk.NORMAL)
-        self.refresh_button.config(state=tk.NORMAL)
-        self.accept_button.config(state=tk.NORMAL)
-        self.start_edit_button.config(state=tk.NORMAL)
-        self.save_edit_button.config(state=tk.DISABLED)
-        self.review_button.config(state=tk.NORMAL)
-        self.start_insert_button.config(state=tk.NORMAL)
-        self.save_insert_button.config(state=tk.DISABLED)
-        self.drop_button.config(state=tk.NORMAL)
-        self.add_note_button.config(state=tk.NORMAL)
-        self.off_task_button.config(state=tk.NORMAL)
-        self.zoom_in_button.config(state=tk.NORMAL)
-        self.zoom_out_button.config(state=tk.NORMAL)
-        self.search_button.config(state=tk.NORMAL)
+        self.buttons.apply('reviewing', next_flagged=self.flagged_button_state())
+        if self.skip_reviewed.get():
+            self.current_index = self.review_queue.next(0) or 0
+            self.highlight_row()
         self.display_word()
         self.update_plot()
-        self.root.update()
-        self.rename_old_files()
+        self.segments.schedule(self.upcoming_segments())
+        self.root.update_idletasks()
+        self.autosave.flush()
+        self.open_journal()
 
     def get_audio_segment(self):
         if AUDIO_ENABLED:
             self.start_time = (self.df.iloc[self.current_index, 1] * 1000) - 500
             self.cursor_position = self.start_time
             if self.current_index == len(self.df) - 1:
-                if self.get_audio_duration(self.audio_file_path) < (self.df.iloc[self.current_index, 2] * 1000) + 2000:
-                    self.end_time = self.get_audio_duration(self.audio_file_path)
+                audio_duration = self.audio_duration * 1000
+                if audio_duration < (self.df.iloc[self.current_index, 2] * 1000) + 2000:
+                    self.end_time = audio_duration
                 else:
                     self.end_time = (self.df.iloc[self.current_index, 2] * 1000) + 2000
             else:
@@ -518,88 +591,114 @@ class AudioPlayerApp:
                 self.label_text.set(f'Current word: {self.word}')
                 self.audio_segment = self.get_audio_segment()
 
-    def next_playback(self):
-        self.root.update()
-        self.df = self.df.sort_values('onset')
-        self.df = self.df.reset_index(drop=True)
+    def next_row(self, row=None):
+        if row is None:
+            row = self.current_index
+        if self.skip_reviewed.get():
+            following = self.review_queue.next(row + 1)
+            return len(self.df) if following is None else following
+        return row + 1
+
+    def next_playback(self, row=None):
+        self.sort_rows()
         self.onset_position = None
         self.offset_position = None
         self.edit = False
         self.insert = False
-        if self.current_index < len(self.df) - 1:
-            self.current_index += 1
+        if row is None:
+            row = self.next_row()
+        if row < len(self.df):
+            self.current_index = row
             self.display_word()
-            self.display_csv()
+            self.highlight_row()
             self.update_plot()
-            self.root.update()
-            if self.current_index == len(self.df) - 1 and self.validation_pressed:
-                self.next_row_button.config(state=tk.DISABLED)
-            self.start_button.config(state=tk.DISABLED)
-            self.restart_button.config(state=tk.NORMAL)
-            self.next_row_button.config(state=tk.NORMAL)
-            self.next_file_button.config(state=tk.NORMAL)
-            self.refresh_button.config(state=tk.NORMAL)
-            self.accept_button.config(state=tk.NORMAL)
-            self.start_edit_button.config(state=tk.NORMAL)
-            self.save_edit_button.config(state=tk.DISABLED)
-            self.review_button.config(state=tk.NORMAL)
-            self.off_task_button.config(state=tk.NORMAL)
-            self.add_note_button.config(state=tk.NORMAL)
-            self.start_insert_button.config(state=tk.NORMAL)
-            self.save_insert_button.config(state=tk.DISABLED)
-            self.drop_button.config(state=tk.NORMAL)
-            self.zoom_in_button.config(state=tk.NORMAL)
-            self.zoom_out_button.config(state=tk.NORMAL)
-            self.search_button.config(state=tk.NORMAL)
+            self.root.update_idletasks()
+            self.buttons.apply('reviewing', next_flagged=self.flagged_button_state())
+            self.segments.schedule(self.upcoming_segments())
         else:
             if self.current_file != len(self.files):
                 self.finished_file = True
-                self.next_file_button.config(state=tk.NORMAL)
+                self.buttons.apply('finished', next_file=NORMAL)
                 self.label_text.set('Finished validating this file. Press "Next File" to continue.')
             else:
-                self.next_file_button.config(state=tk.DISABLED)
-            self.start_button.config(state=tk.DISABLED)
-            self.restart_button.config(state=tk.NORMAL)
-            self.refresh_button.config(state=tk.NORMAL)
-            self.next_row_button.config(state=tk.DISABLED)
-            self.accept_button.config(state=tk.DISABLED)
-            self.start_edit_button.config(state=tk.DISABLED)
-            self.save_edit_button.config(state=tk.DISABLED)
-            self.review_button.config(state=tk.DISABLED)
-            self.off_task_button.config(state=tk.DISABLED)
-            self.add_note_button.config(state=tk.DISABLED)
-            self.start_insert_button.config(state=tk.DISABLED)
-            self.save_insert_button.config(state=tk.DISABLED)
-            self.drop_button.config(state=tk.DISABLED)
-            self.zoom_in_button.config(state=tk.DISABLED)
-            self.zoom_out_button.config(state=tk.DISABLED)
-            self.search_button.config(state=tk.DISABLED)
-        self.save_data()
+                self.buttons.apply('finished', next_file=DISABLED)
 
-    def rename_old_files(self):
+    def edited_path(self):
         directory = self.folder_path.replace('audio_transcripts', 'edited')
         os.makedirs(directory, exist_ok=True)
         base_filename = os.path.splitext(os.path.basename(self.file_path))[0]
-        self.edited_file_path = os.path.join(directory, f'{base_filename}_edited_file.csv')
-        index = 0
-        existing_file = self.edited_file_path
-        while os.path.exists(existing_file):
-            new_name = f'{base_filename}_edited_file_OLD{"_" + str(index) if index > 0 else ""}.csv'
-            new_file_path = os.path.join(directory, new_name)
-            existing_file = new_file_path
-            index += 1
-        for i in range(index-1, 0, -1):
-            old_file_path = os.path.join(directory, f'{base_filename}_edited_file_OLD{"_" + str(i-1) if i > 1 else ""}.csv')
-            new_file_path = os.path.join(directory, f'{base_filename}_edited_file_OLD_{i}.csv')
-            os.rename(old_file_path, new_file_path)
-        if index > 0:
-            os.rename(self.edited_file_path, os.path.join(directory, f'{base_filename}_edited_file_OLD.csv'))
+        return os.path.join(directory, f'{base_filename}_edited_file.csv')
+
+    def load_edited(self):
+        # Offer to continue from a previous session's edited file (with any
+        # changes still in its journal) instead of the raw transcript.
+        self.resumed = False
+        if os.path.exists(self.edited_file_path):
+            self.resumed = messagebox.askyesno(
+                "Resume", f"Continue from the edits saved in {os.path.basename(self.edited_file_path)}?")
+        if self.resumed:
+            self.df = recover(self.edited_file_path)
+            print(f"Resumed from: {self.edited_file_path}")
+
+    def open_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = ChangeJournal(journal_path_for(self.edited_file_path),
+                                     history_path=history_path_for(self.edited_file_path))
+        # Compacting folds whatever the previous session left in the journal
+        # into the history; a fresh start is then marked there, so the old
+        # version stays recoverable without an _OLD copy of the CSV. An
+        # edited CSV the history knows nothing about is copied into it
+        # before it is overwritten.
+        self.save_data()
+        if not self.resumed:
+            self.journal.start_session(self.file_path)
+            self.resumed = True
+
+    def log_change(self, op, row=None, values=None):
+        if self.journal is not None:
+            self.journal.append(op, row, values, editor=self.initials)
+            if self.autosave_job is None:
+                self.autosave_job = self.root.after(int(self.autosave_interval * 1000), self.periodic_autosave)
+
+    def periodic_autosave(self):
+        self.autosave_job = None
+        if self.journal is not None:
+            self.autosave_data()
 
     def save_data(self):
-        self.df.to_csv(self.edited_file_path, index=False)
+        # Materialise the edited CSV from the in-memory frame and start a new
+        # journal on top of it; individual changes only append to the journal.
+        self.journal.compact(self.df, self.edited_file_path)
         print(f"Changes saved to: {self.edited_file_path}")
 
+    def autosave_data(self, then=None):
+        # Same as save_data, but the CSV is written by the autosave thread;
+        # changes journaled after `mark` carry over into the new journal.
+        journal, mark = self.journal, self.journal.mark()
+        self.autosave.submit(self.edited_file_path, self.df,
+                             write=lambda df, path: journal.compact(df, path, mark), then=then)
+
+    def close_journal(self):
+        if self.autosave_job is not None:
+            self.root.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        if self.journal is not None:
+            self.autosave_data(then=self.journal.close)
+            self.journal = None
+
+    def on_close(self):
+        self.close_journal()
+        self.autosave.close()
+        self.prefetcher.shutdown()
+        self.segments.shutdown()
+        self.player.close()
+        if self.view is not None:
+            self.view.destroy()
+        self.root.destroy()
+
     def import_data(self, file):
+        self.close_journal()
         if not file:
             try:
                 self.folder_path = filedialog.askdirectory(title="Select Folder")
@@ -613,66 +712,47 @@ class AudioPlayerApp:
             except Exception as e:
                 print(e)
         self.file_path = self.files[self.current_file]
-        dir = self.file_path.split('/')
         print(self.file_path)
-        self.name = dir[-1].split('_')[0]
-        self.task_text.set(f'Now displaying: {self.name}')
-        self.audio_file_path = (f"{'/'.join(dir[:-1])}/{self.name}.wav")
-        audio_list = self.audio_file_path.split('/')
-        audio_list[-3] = 'audio_transcripts'
-        self.audio_file_path = '/'.join(audio_list)
         if self.file_path:
-            self.df = pd.read_csv(self.file_path)
-            self.df = self.df.copy()
-            self.display_csv()
-            self.audio_duration = self.get_audio_duration(self.audio_file_path)/1000
-            self.audio_data = self.load_audio()
+            prepared = self.prefetcher.take(self.file_path) or prepare_file(self.file_path, self.audio_cache, self.persist_waveform)
+            if prepared.audio_data is None:
+                prepared = load_file_audio(prepared, self.audio_cache, self.persist_waveform)
+            self.name = prepared.name
+            self.task_text.set(f'Now displaying: {self.name}')
+            self.audio_file_path = prepared.audio_file_path
+            self.df = prepared.df
+            self.edited_file_path = self.edited_path()
+            self.load_edited()
+            self.audio_info = prepared.audio_info
+            self.audio_duration = self.audio_info.duration
+            self.rate = prepared.rate
+            self.audio_data = prepared.audio_data
+            self.waveform = prepared.waveform
+            self.segments.reset(self.audio_data)
             self.initial_x_range = (0, self.audio_duration)
             self.x_range = self.initial_x_range
             self.init_plot()
             self.canvas.draw()
-            if 'quality_check_label' not in self.df.columns:
-                self.df['quality_check_label'] = pd.Series([float('nan')]*len(self.df), dtype='float')
-            if 'note' not in self.df.columns:
-                self.df['note'] = pd.Series([float('nan')]*len(self.df), dtype='float')
-            self.start_button.config(state=tk.NORMAL)
-            self.refresh_button.config(state=tk.DISABLED)
-            self.restart_button.config(state=tk.NORMAL)
-            self.next_row_button.config(state=tk.DISABLED)
-            self.next_file_button.config(state=tk.NORMAL)
-            self.accept_button.config(state=tk.DISABLED)
-            self.start_edit_button.config(state=tk.DISABLED)
-            self.save_edit_button.config(state=tk.DISABLED)
-            self.review_button.config(state=tk.DISABLED)
-            self.off_task_button.config(state=tk.DISABLED)
-            self.add_note_button.config(state=tk.DISABLED)
-            self.drop_button.config(state=tk.DISABLED)
-            self.start_insert_button.config(state=tk.DISABLED)
-            self.save_insert_button.config(state=tk.DISABLED)
-            self.whole_audio_button.config(state=tk.NORMAL)
-            self.search_button.config(state=tk.DISABLED)
+            self.current_index = 0
+            self.transcript_index = TranscriptIndex(self.df)
+            self.review_queue = ReviewQueue(self.df, self.review_min_confidence)
+            self.flagged_onsets = load_flagged_onsets(self.file_path)
+            self.flagged_position = 0
+            self.display_csv()
+            self.buttons.apply('loaded')
             self.validation_pressed = False
             self.current_index = 0
+            if self.resumed:
+                self.current_index = self.review_queue.next(0) or 0
+                self.highlight_row()
+            self.prefetcher.schedule(self.files[self.current_file + 1:])
 
     def next_file(self):
         self.edit = False
         self.insert = False
         if self.current_file == len(self.files) - 1:
             self.label_text.set("Finished validating all files.")
-            self.start_button.config(state=tk.DISABLED)
-            self.refresh_button.config(state=tk.DISABLED)
-            self.restart_button.config(state=tk.DISABLED)
-            self.next_row_button.config(state=tk.DISABLED)
-            self.accept_button.config(state=tk.DISABLED)
-            self.start_edit_button.config(state=tk.DISABLED)
-            self.save_edit_button.config(state=tk.DISABLED)
-            self.review_button.config(state=tk.DISABLED)
-            self.off_task_button.config(state=tk.DISABLED)
-            self.start_insert_button.config(state=tk.DISABLED)
-            self.save_insert_button.config(state=tk.DISABLED)
-            self.drop_button.config(state=tk.DISABLED)
-            self.add_note_button.config(state=tk.DISABLED)
-            self.off_task_button.config(state=tk.DISABLED)
+            self.buttons.apply('all_files_done')
         else:
             self.current_file += 1
             self.current_index = 0
@@ -689,38 +769,42 @@ class AudioPlayerApp:
                 user_input = simpledialog.askstring("Input", "Add note in space below:")
                 if user_input is not None:
                     self.df.at[self.current_index, 'note'] = user_input
-            self.root.update()
-            self.save_data()
+            self.transcript.update_row(self.df, self.current_index)
+            self.review_queue.mark_reviewed(self.current_index)
+            self.log_change('set', self.current_index, {
+                col: self.df.at[self.current_index, col] for col in ('editor', 'quality_check_label', 'note')})
+            self.root.update_idletasks()
 
     def mark_edit_label(self, label, data):
         if pd.notna(self.df.at[self.current_index, 'word']):
             self.df.at[self.current_index, 'editor'] = self.initials
+            self.log_change('set', self.current_index, {'editor': self.initials})
             if label == 'drop':
                 self.df = self.df.drop(self.current_index).reset_index(drop=True)
+                self.log_change('drop', self.current_index)
+                self.transcript.delete_row(self.current_index)
+                self.transcript_index.remove(self.current_index)
+                self.review_queue.rebuild(self.df)
                 self.current_index -= 1
             else:
+                self.transcript.update_row(self.df, self.current_index)
                 if label == 'edit':
                     if self.edit:
                         self.edit_data(self.new_word)
-                        self.save_edit_button.config(state=tk.DISABLED)
-                        self.next_row_button.config(state=tk.NORMAL)
+                        self.buttons.apply('edit_saved')
                         self.edit = False
                         self.onset_position = None
                     else:
                         self.edit = True
                         self.new_word = data
-                        self.start_edit_button.config(state=tk.DISABLED)
-                        self.save_edit_button.config(state=tk.NORMAL)
-                        self.start_insert_button.config(state=tk.DISABLED)
-                        self.save_insert_button.config(state=tk.DISABLED)
+                        self.buttons.apply('editing')
                 elif label == 'insert':
                     if self.insert:
                         if data != '':
                             self.insert_data(self.new_word)
                         else:
                             messagebox.showinfo("Insert Popup", "Make you've input a word into the space below")
-                        self.save_insert_button.config(state=tk.DISABLED)
-                        self.next_row_button.config(state=tk.NORMAL)
+                        self.buttons.apply('insert_saved')
                         self.blue_end_line.set_visible(False)
                         self.blue_start_line.set_visible(False)
                         self.blue_highlight_space.set_visible(False)
@@ -729,12 +813,8 @@ class AudioPlayerApp:
                     else:
                         self.insert = True
                         self.new_word = data
-                        self.start_insert_button.config(state=tk.DISABLED)
-                        self.save_insert_button.config(state=tk.NORMAL)
-                        self.start_edit_button.config(state=tk.DISABLED)
-                        self.save_edit_button.config(state=tk.DISABLED)
-            self.root.update()
-            self.save_data()
+                        self.buttons.apply('inserting')
+            self.root.update_idletasks()
 
     def edit_data(self, data):
         if data == '':
@@ -750,11 +830,19 @@ class AudioPlayerApp:
         if self.df.loc[self.current_index, 'quality_check_label'] == 'insert':
             edit_label = 'insert'
         self.df.loc[self.current_index] = [data, self.start_section, self.end_section, confidence] + [edit_label] + [np.nan] + [self.initials] + [np.nan] * (self.df.shape[1] - 7)
+        self.transcript.update_row(self.df, self.current_index)
+        self.transcript_index.update(self.current_index, data, self.start_section)
+        self.review_queue.mark_reviewed(self.current_index)
+        self.log_change('row', self.current_index, self.df.loc[self.current_index].tolist())
 
     def insert_data(self, data):
         index_to_insert = self.current_index + 1
         new_row = [data, self.insert_start_section, self.insert_end_section] + [np.nan] + ['insert'] + [np.nan] + [self.initials] + [np.nan] * (self.df.shape[1] - 7)
         new_df = pd.DataFrame([new_row], columns=self.df.columns)
         self.df = pd.concat([self.df.iloc[:index_to_insert], new_df, self.df.iloc[index_to_insert:]], ignore_index=True)
+        self.transcript.insert_row(self.df, index_to_insert)
+        self.transcript_index.insert(index_to_insert, data, self.insert_start_section)
+        self.review_queue.rebuild(self.df)
+        self.log_change('insert', index_to_insert, new_row)
 
 
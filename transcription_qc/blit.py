@@ -0,0 +1,57 @@
+class BlitManager:
+    """
+    Redraw a set of animated artists over a cached figure background.
+
+    A full `canvas.draw()` renders everything except the animated artists
+    and fires `draw_event`, where the background is captured. `update`
+    then restores that background and draws only the animated artists, so
+    moving a cursor line costs the same no matter how much is plotted
+    underneath it.
+    """
+
+    def __init__(self, canvas, artists=()):
+        self.canvas = canvas
+        self._background = None
+        self._artists = []
+        for artist in artists:
+            self.add_artist(artist)
+        self._cid = canvas.mpl_connect('draw_event', self.on_draw)
+
+    def add_artist(self, artist):
+        artist.set_animated(True)
+        self._artists.append(artist)
+
+    def on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        figure = self.canvas.figure
+        for artist in self._artists:
+            figure.draw_artist(artist)
+
+    def update(self):
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
+        self._background = None
+
+
+def set_span(span, x0: float, x1: float):
+    """
+    Move an `axvspan` patch in place instead of removing and recreating it.
+    """
+    if hasattr(span, 'set_width'):
+        # matplotlib >= 3.9 returns a Rectangle
+        span.set_x(x0)
+        span.set_width(x1 - x0)
+    else:
+        xy = span.get_xy()
+        xy[:, 0] = [x0, x0, x1, x1, x0]
+        span.set_xy(xy)
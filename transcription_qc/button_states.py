@@ -0,0 +1,69 @@
+NORMAL = 'normal'
+DISABLED = 'disabled'
+
+# The buttons each UI state enables or disables. A state only lists the
+# buttons it changes; the rest keep whatever state they already had.
+BUTTON_STATES = {
+    'loaded': {
+        'start': NORMAL, 'refresh': DISABLED, 'restart': NORMAL, 'next_row': DISABLED, 'next_file': NORMAL,
+        'accept': DISABLED, 'start_edit': DISABLED, 'save_edit': DISABLED, 'review': DISABLED,
+        'off_task': DISABLED, 'add_note': DISABLED, 'drop': DISABLED, 'start_insert': DISABLED,
+        'save_insert': DISABLED, 'whole_audio': NORMAL, 'search': DISABLED, 'next_flagged': DISABLED,
+    },
+    'reviewing': {
+        'start': DISABLED, 'restart': NORMAL, 'next_row': NORMAL, 'next_file': NORMAL, 'refresh': NORMAL,
+        'accept': NORMAL, 'start_edit': NORMAL, 'save_edit': DISABLED, 'review': NORMAL, 'off_task': NORMAL,
+        'add_note': NORMAL, 'start_insert': NORMAL, 'save_insert': DISABLED, 'drop': NORMAL,
+        'zoom_in': NORMAL, 'zoom_out': NORMAL, 'search': NORMAL,
+    },
+    'finished': {
+        'start': DISABLED, 'restart': NORMAL, 'refresh': NORMAL, 'next_row': DISABLED, 'accept': DISABLED,
+        'start_edit': DISABLED, 'save_edit': DISABLED, 'review': DISABLED, 'off_task': DISABLED,
+        'add_note': DISABLED, 'start_insert': DISABLED, 'save_insert': DISABLED, 'drop': DISABLED,
+        'zoom_in': DISABLED, 'zoom_out': DISABLED, 'search': DISABLED, 'next_flagged': DISABLED,
+    },
+    'restarted': {
+        'start': NORMAL, 'refresh': DISABLED, 'start_insert': DISABLED, 'save_insert': DISABLED,
+        'restart': NORMAL, 'next_row': DISABLED, 'next_file': NORMAL, 'accept': DISABLED,
+        'start_edit': DISABLED, 'save_edit': DISABLED, 'drop': DISABLED, 'review': DISABLED,
+        'add_note': NORMAL, 'off_task': NORMAL,
+    },
+    'all_files_done': {
+        'start': DISABLED, 'refresh': DISABLED, 'restart': DISABLED, 'next_row': DISABLED,
+        'accept': DISABLED, 'start_edit': DISABLED, 'save_edit': DISABLED, 'review': DISABLED,
+        'off_task': DISABLED, 'start_insert': DISABLED, 'save_insert': DISABLED, 'drop': DISABLED,
+        'add_note': DISABLED,
+    },
+    'entering_text': {'next_row': DISABLED},
+    'editing': {'start_edit': DISABLED, 'save_edit': NORMAL, 'start_insert': DISABLED, 'save_insert': DISABLED},
+    'edit_saved': {'save_edit': DISABLED, 'next_row': NORMAL},
+    'inserting': {'start_insert': DISABLED, 'save_insert': NORMAL, 'start_edit': DISABLED, 'save_edit': DISABLED},
+    'insert_saved': {'save_insert': DISABLED, 'next_row': NORMAL},
+}
+
+
+class ButtonStates:
+    """
+    Move a set of Tk buttons between the states in `table`.
+
+    The last state set on each button is remembered, so `apply` only calls
+    `config` on buttons whose state actually changes; stepping from one
+    row to the next therefore touches no widgets at all.
+    """
+
+    def __init__(self, buttons: dict, table: dict = BUTTON_STATES):
+        self.buttons = buttons
+        self.table = table
+        self._current = {name: str(button.cget('state')) for name, button in buttons.items()}
+
+    def set(self, name: str, state: str):
+        if self._current.get(name) != state:
+            self.buttons[name].config(state=state)
+            self._current[name] = state
+
+    def apply(self, state: str, **overrides):
+        for name, value in {**self.table[state], **overrides}.items():
+            self.set(name, value)
+
+    def enabled(self, name: str) -> bool:
+        return self._current.get(name) != DISABLED
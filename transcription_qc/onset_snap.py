@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class BoundaryDetector:
+    """
+    Word boundary candidates from short-time energy and zero-crossing rate.
+
+    A frame counts as active when its energy is `threshold_db` above the
+    recording's noise floor, or when it is within 6 dB of that and has a
+    high zero-crossing rate (quiet fricatives such as /s/ and /f/). The
+    onsets and offsets are the frame times where activity switches on and
+    off; `snap` moves a clicked time to the nearest one.
+    """
+
+    def __init__(self, onsets: np.ndarray, offsets: np.ndarray, energy_db: np.ndarray, zcr: np.ndarray,
+                 active: np.ndarray, hop: float, frame: float):
+        self.onsets = onsets
+        self.offsets = offsets
+        self.energy_db = energy_db
+        self.zcr = zcr
+        self.active = active
+        self.hop = hop
+        self.frame = frame
+
+    @classmethod
+    def build(cls, audio, sample_rate: int, frame: float = 0.02, hop: float = 0.01, threshold_db: float = 12.0,
+              zcr_threshold: float = 0.25, chunk_frames: int = 1 << 16) -> 'BoundaryDetector':
+        frame_len = max(1, int(frame * sample_rate))
+        hop_len = max(1, int(hop * sample_rate))
+        count = max(0, (len(audio) - frame_len) // hop_len + 1)
+        energy = np.empty(count, dtype=np.float32)
+        zcr = np.empty(count, dtype=np.float32)
+        for first in range(0, count, chunk_frames):
+            n = min(chunk_frames, count - first)
+            start = first * hop_len
+            samples = np.asarray(audio[start:start + (n - 1) * hop_len + frame_len], dtype=np.float32)
+            # Per-frame sums from running totals, so frames cost O(1) each
+            power = np.concatenate([[0.0], np.cumsum(samples.astype(np.float64) ** 2)])
+            flips = np.concatenate([[0], np.cumsum(np.signbit(samples[1:]) != np.signbit(samples[:-1]))])
+            starts = np.arange(n) * hop_len
+            energy[first:first + n] = (power[starts + frame_len] - power[starts]) / frame_len
+            zcr[first:first + n] = (flips[starts + frame_len - 1] - flips[starts]) / frame_len
+        energy_db = 10 * np.log10(energy + 1e-10)
+        floor = np.percentile(energy_db, 10) if count else 0.0
+        active = (energy_db > floor + threshold_db) | ((energy_db > floor + threshold_db - 6) & (zcr > zcr_threshold))
+        edges = np.diff(active.astype(np.int8))
+        centre = (frame_len / 2) / sample_rate
+        onsets = (np.flatnonzero(edges == 1) + 1) * hop_len / sample_rate + centre
+        offsets = (np.flatnonzero(edges == -1) + 1) * hop_len / sample_rate + centre
+        return cls(onsets, offsets, energy_db, zcr, active, hop_len / sample_rate, frame_len / sample_rate)
+
+    def frame_at(self, t) -> np.ndarray:
+        """Index of the frame centred nearest to each time in `t`."""
+        index = np.rint((np.asarray(t, dtype=float) - self.frame / 2) / self.hop).astype(int)
+        return np.clip(index, 0, max(0, len(self.active) - 1))
+
+    def snap(self, t: float, tolerance: float, kind: str = None) -> float:
+        """
+        Return the onset (kind='onset'), offset (kind='offset') or either
+        boundary nearest to `t`, or `t` itself when none is within
+        `tolerance` seconds.
+        """
+        if kind == 'onset':
+            candidates = self.onsets
+        elif kind == 'offset':
+            candidates = self.offsets
+        else:
+            candidates = np.union1d(self.onsets, self.offsets)
+        i = np.searchsorted(candidates, t)
+        best, best_distance = t, tolerance
+        for j in (i - 1, i):
+            if 0 <= j < len(candidates) and abs(candidates[j] - t) <= best_distance:
+                best, best_distance = candidates[j], abs(candidates[j] - t)
+        return float(best)
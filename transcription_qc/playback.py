@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from qc_common.lazy import lazy_import
+
+# Importing sounddevice loads PortAudio and enumerates devices, so defer it
+# until the first stream is opened.
+sd = lazy_import('sounddevice')
+
+
+class PlaybackEngine:
+    """
+    Play a range of a mono float32 buffer through a sounddevice
+    OutputStream and publish the position the device has actually played.
+
+    The stream callback pulls `blocksize` frames at a time straight from
+    the buffer, so a memory-mapped `LazyAudio` is only converted as it is
+    played. `position` combines the frame index of the last block with the
+    time that block reaches the DAC, so a UI polling it stays locked to the
+    audio clock however late its own timers fire.
+
+    One stream is kept open for as long as the sample rate stays the same:
+    `play` only swaps the buffer and range the callback reads, and the
+    callback writes silence while idle, so a key press never waits for
+    PortAudio to open a device.
+
+    `offset` places a buffer that was cut out of a longer recording, so
+    `position` is still reported in recording time. `last_latency` is the
+    time from the `requested_at` passed to `play` (by default the call
+    itself) until the first sample reached the device.
+    """
+
+    def __init__(self, blocksize: int = 1024):
+        self.blocksize = blocksize
+        self._stream = None
+        self._stream_rate = None
+        self._lock = threading.Lock()
+        self._data = None
+        self._rate = 1
+        self._start = 0
+        self._stop = 0
+        self._next_frame = 0
+        self._block_frame = 0
+        self._block_dac_time = 0.0
+        self._end_time = 0.0
+        self._offset = 0.0
+        self._requested_at = None
+        self.last_latency = None
+
+    def _ensure_stream(self, sample_rate):
+        stream = self._stream
+        if stream is not None and self._stream_rate == sample_rate and stream.active:
+            return stream
+        self.close()
+        stream = sd.OutputStream(samplerate=sample_rate, channels=1, dtype='float32',
+                                 blocksize=self.blocksize, callback=self._callback)
+        stream.start()
+        self._stream, self._stream_rate = stream, sample_rate
+        return stream
+
+    def play(self, data, sample_rate: int, start: int = 0, stop: Optional[int] = None, offset: float = 0.0,
+             requested_at: Optional[float] = None):
+        if requested_at is None:
+            requested_at = time.perf_counter()
+        stop = len(data) if stop is None else min(stop, len(data))
+        start = min(max(0, start), stop)
+        # Silence the current range first so a stream reopened for a new
+        # rate never plays the old buffer at the wrong speed.
+        self.stop()
+        self._ensure_stream(sample_rate)
+        with self._lock:
+            self._data = data
+            self._rate = sample_rate
+            self._start = self._next_frame = self._block_frame = start
+            self._stop = stop
+            self._block_dac_time = 0.0
+            self._end_time = 0.0
+            self._offset = offset
+            self._requested_at = requested_at
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self._lock:
+            frame = self._next_frame
+            if self._data is None or frame >= self._stop:
+                # Idle: the stream stays open and plays silence
+                outdata[:] = 0
+                return
+            chunk = np.asarray(self._data[frame:min(frame + frames, self._stop)], dtype=np.float32)
+            self._next_frame = frame + len(chunk)
+            self._block_frame = frame
+            dac_time = time_info.outputBufferDacTime
+            self._block_dac_time = dac_time
+            to_dac = dac_time - time_info.currentTime if dac_time else 0.0
+            if self._next_frame >= self._stop:
+                # The range is done once its last sample has been heard
+                self._end_time = time_info.currentTime + max(0.0, to_dac) + len(chunk) / self._rate
+            if self._requested_at is not None:
+                self.last_latency = time.perf_counter() - self._requested_at + max(0.0, to_dac)
+                self._requested_at = None
+        outdata[:len(chunk), 0] = chunk
+        outdata[len(chunk):] = 0
+
+    def stop(self):
+        """Stop playing; the stream is kept open, playing silence."""
+        with self._lock:
+            self._stop = self._next_frame
+            self._end_time = 0.0
+            self._data = None
+
+    def close(self):
+        """Stop and release the output stream."""
+        self.stop()
+        stream, self._stream, self._stream_rate = self._stream, None, None
+        if stream is not None:
+            stream.abort()
+            stream.close()
+
+    @property
+    def active(self) -> bool:
+        """Whether a range is still being played, up to its last sample reaching the device."""
+        stream = self._stream
+        if stream is None:
+            return False
+        with self._lock:
+            if self._next_frame < self._stop:
+                return True
+            end_time = self._end_time
+        return end_time > 0 and stream.time < end_time
+
+    @property
+    def position(self) -> float:
+        """Seconds into the buffer that have reached the output device."""
+        stream = self._stream
+        with self._lock:
+            frame, dac_time, written = self._block_frame, self._block_dac_time, self._next_frame
+        if stream is None:
+            return self._offset + written / self._rate
+        if dac_time:
+            frame += (stream.time - dac_time) * self._rate
+        else:
+            # Host APIs without DAC timestamps: assume the device is one
+            # output latency behind what has been handed to it.
+            frame = written - stream.latency * self._rate
+        return self._offset + min(max(frame, self._start), written) / self._rate
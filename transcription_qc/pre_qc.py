@@ -0,0 +1,161 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from qc_common.journal import write_csv_atomic
+
+from .audio_io import decode_wav, transcript_audio_path
+from .onset_snap import BoundaryDetector
+
+
+PRE_QC_FOLDER = 'pre_qc'
+# Output folders and files of the QC tools, which are not transcripts
+SKIPPED_FOLDERS = {PRE_QC_FOLDER, 'edited'}
+EDITED_SUFFIX = '_edited_file.csv'
+
+
+def pre_qc_path_for(csv_path: str) -> str:
+    # Kept in a subfolder so the GUI's folder listing never mistakes the
+    # flags for a transcript.
+    return os.path.join(os.path.dirname(csv_path), PRE_QC_FOLDER, os.path.basename(csv_path))
+
+
+def find_transcripts(folder: str) -> List[str]:
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d not in SKIPPED_FOLDERS]
+        paths.extend(os.path.join(root, f) for f in files
+                     if f.endswith('.csv') and 'Recall' in f and not f.endswith(EDITED_SUFFIX))
+    return sorted(paths)
+
+
+def _runs(mask):
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def flag_rows(df: pd.DataFrame, detector: BoundaryDetector, min_confidence: float = 0.5,
+              silent_fraction: float = 0.1, min_gap: float = 0.3) -> pd.DataFrame:
+    """
+    Suggest a quality_check_label for every transcript row.
+
+    Rows are proposed for review when their confidence is below
+    `min_confidence`, their span is empty or overlaps an earlier word, or
+    less than `silent_fraction` of it is speech. Stretches of speech of at
+    least `min_gap` seconds that no word covers are added with row -1.
+    """
+    onset = pd.to_numeric(df['onset'], errors='coerce').to_numpy(float)
+    offset = pd.to_numeric(df['offset'], errors='coerce').to_numpy(float)
+    confidence = pd.to_numeric(df['confidence'], errors='coerce').to_numpy(float)
+    reasons = [[] for _ in range(len(df))]
+
+    def add(mask, reason):
+        for i in np.flatnonzero(mask):
+            reasons[i].append(reason)
+
+    valid = np.isfinite(onset) & np.isfinite(offset) & (offset > onset)
+    add(confidence < min_confidence, 'low_confidence')
+    add(~valid, 'zero_length')
+
+    order = np.argsort(onset, kind='stable')
+    previous_end = np.concatenate([[-np.inf], np.fmax.accumulate(offset[order])[:-1]])
+    overlap = np.zeros(len(df), dtype=bool)
+    overlap[order] = onset[order] < previous_end
+    add(overlap, 'overlap')
+
+    active = detector.active
+    f0 = detector.frame_at(np.where(valid, onset, 0))
+    f1 = np.maximum(f0 + 1, detector.frame_at(np.where(valid, offset, 0)) + 1)
+    speech = np.concatenate([[0], np.cumsum(active)])
+    fraction = (speech[np.minimum(f1, len(active))] - speech[f0]) / (f1 - f0)
+    add(valid & (fraction < silent_fraction), 'silent')
+
+    covered = np.zeros(len(active) + 1, dtype=int)
+    np.add.at(covered, f0[valid], 1)
+    np.add.at(covered, np.minimum(f1[valid], len(active)), -1)
+    starts, ends = _runs(active & (np.cumsum(covered)[:-1] == 0))
+    keep = (ends - starts) * detector.hop >= min_gap
+    gap_onsets = starts[keep] * detector.hop + detector.frame / 2
+    gap_offsets = ends[keep] * detector.hop + detector.frame / 2
+
+    flags = pd.DataFrame({
+        'row': np.arange(len(df)),
+        'onset': onset,
+        'offset': offset,
+        'word': df['word'].to_numpy(),
+        'candidate': ['for_review' if r else 'accept' for r in reasons],
+        'reason': [';'.join(r) for r in reasons],
+    })
+    gaps = pd.DataFrame({
+        'row': -1,
+        'onset': gap_onsets,
+        'offset': gap_offsets,
+        'word': '',
+        'candidate': 'for_review',
+        'reason': 'untranscribed_speech',
+    })
+    if gaps.empty:
+        return flags
+    return pd.concat([flags, gaps], ignore_index=True).sort_values('onset', kind='stable').reset_index(drop=True)
+
+
+def pre_qc_file(csv_path: str, min_confidence: float = 0.5, silent_fraction: float = 0.1,
+                min_gap: float = 0.3) -> dict:
+    df = pd.read_csv(csv_path)
+    rate, audio = decode_wav(transcript_audio_path(csv_path), mmap=True)
+    flags = flag_rows(df, BoundaryDetector.build(audio, rate), min_confidence, silent_fraction, min_gap)
+    out_path = pre_qc_path_for(csv_path)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    write_csv_atomic(flags, out_path)
+    return {'path': csv_path, 'rows': len(df), 'flagged': int((flags['candidate'] != 'accept').sum())}
+
+
+def run_pre_qc(folder: str, workers: Optional[int] = None, **options) -> List[dict]:
+    """
+    Flag every Recall transcript under `folder` in a process pool and write
+    the suggestions next to each CSV (see `pre_qc_path_for`).
+    """
+    paths = find_transcripts(folder)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(pre_qc_file, path, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Pre-QC of {futures[future]} failed: {e}")
+                continue
+            print(f"{result['path']}: {result['flagged']} to review ({result['rows']} rows)")
+            results.append(result)
+    return results
+
+
+def load_flagged_onsets(csv_path: str) -> np.ndarray:
+    """Sorted onsets of the suggestions that need a reviewer, if any exist."""
+    path = pre_qc_path_for(csv_path)
+    if not os.path.exists(path):
+        return np.empty(0)
+    flags = pd.read_csv(path)
+    onsets = flags.loc[flags['candidate'] != 'accept', 'onset'].to_numpy(float)
+    return np.unique(onsets[np.isfinite(onsets)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flag transcript rows that need manual QC')
+    parser.add_argument('folder', help='Folder containing Recall transcript CSVs')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--silent-fraction', type=float, default=0.1)
+    parser.add_argument('--min-gap', type=float, default=0.3,
+                        help='Shortest untranscribed speech, in seconds, worth flagging')
+    args = parser.parse_args(argv)
+    run_pre_qc(os.path.abspath(args.folder), args.workers, min_confidence=args.min_confidence,
+               silent_fraction=args.silent_fraction, min_gap=args.min_gap)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional
+
+import pandas as pd
+
+from .audio_io import AudioCache, WavInfo, transcript_audio_path
+from .waveform import load_or_build_pyramid
+
+
+class PreparedFile(NamedTuple):
+    file_path: str
+    audio_file_path: str
+    name: str
+    df: pd.DataFrame
+    audio_info: WavInfo
+    rate: Optional[int] = None
+    audio_data: Any = None
+    waveform: Any = None
+
+
+def prepare_file(file_path: str, audio_cache: AudioCache, persist_waveform: bool = True,
+                 max_audio_bytes: Optional[int] = None) -> PreparedFile:
+    """
+    Read a transcript CSV and load its recording and waveform envelope.
+
+    Touches no Tk state, so it can run on a worker thread. The audio is
+    skipped (left for the caller to load) when decoding it would add more
+    than `max_audio_bytes` to `audio_cache`.
+    """
+    audio_file_path = transcript_audio_path(file_path)
+    name = os.path.basename(file_path).split('_')[0]
+    df = pd.read_csv(file_path)
+    if 'quality_check_label' not in df.columns:
+        df['quality_check_label'] = pd.Series([float('nan')]*len(df), dtype='float')
+    if 'note' not in df.columns:
+        df['note'] = pd.Series([float('nan')]*len(df), dtype='float')
+    prepared = PreparedFile(file_path, audio_file_path, name, df, audio_cache.info(audio_file_path))
+    if max_audio_bytes is not None and not audio_cache.contains(audio_file_path) \
+            and audio_cache.decoded_size(audio_file_path) > max_audio_bytes:
+        return prepared
+    return load_file_audio(prepared, audio_cache, persist_waveform)
+
+
+def load_file_audio(prepared: PreparedFile, audio_cache: AudioCache, persist_waveform: bool = True) -> PreparedFile:
+    path = prepared.audio_file_path
+    rate, audio_data = audio_cache.get(path)
+    waveform = audio_cache.derived(
+        path, 'waveform', lambda: load_or_build_pyramid(path, audio_data, rate, persist=persist_waveform))
+    return prepared._replace(rate=rate, audio_data=audio_data, waveform=waveform)
+
+
+class Prefetcher:
+    """
+    Prepare the next `depth` transcript files on a worker thread while the
+    current one is being reviewed.
+
+    Prefetched audio goes into the shared `AudioCache`; `max_bytes` caps
+    how much decoded audio the prefetcher may add on top of what the cache
+    already holds, so look-ahead never evicts the file under review.
+    """
+
+    def __init__(self, audio_cache: AudioCache, depth: int = 1, max_bytes: Optional[int] = None,
+                 persist_waveform: bool = True):
+        self.audio_cache = audio_cache
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.persist_waveform = persist_waveform
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self._futures = OrderedDict()
+
+    def _budget(self):
+        budget = self.audio_cache.max_bytes - self.audio_cache.nbytes
+        if self.max_bytes is not None:
+            budget = min(budget, self.max_bytes)
+        return max(0, budget)
+
+    def _load(self, file_path):
+        return prepare_file(file_path, self.audio_cache, self.persist_waveform, self._budget())
+
+    def schedule(self, upcoming: List[str]):
+        wanted = upcoming[:self.depth]
+        for path in list(self._futures):
+            if path not in wanted:
+                self._futures.pop(path).cancel()
+        for path in wanted:
+            if path not in self._futures:
+                self._futures[path] = self._executor.submit(self._load, path)
+
+    def take(self, file_path: str) -> Optional[PreparedFile]:
+        """
+        Return the prepared file, waiting for it if it is still loading, or
+        None if it was never scheduled or failed to load.
+        """
+        future = self._futures.pop(file_path, None)
+        if future is None or future.cancelled():
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Prefetch of {file_path} failed: {e}")
+            return None
+
+    def shutdown(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._executor.shutdown(wait=False)
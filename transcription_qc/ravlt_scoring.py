@@ -1,21 +1,30 @@
+import importlib
 import tkinter as tk
 try:
     from .initials import InitialsEntryApp
-    from .audio_player_app import AudioPlayerApp
 except ImportError:
     import os, sys
-    sys.path.append(os.path.dirname(__file__))
-    from initials import InitialsEntryApp
-    from audio_player_app import AudioPlayerApp
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from transcription_qc.initials import InitialsEntryApp
+from qc_common.lazy import preload
 
+APP_MODULE = 'transcription_qc.audio_player_app'
 
-if __name__ == "__main__":
+
+def main():
+    # The audio app pulls in pandas, matplotlib and scipy; import it in the
+    # background while the initials window waits for the reviewer.
+    loader = preload(APP_MODULE)
     initials_root = tk.Tk()
     initials_app = InitialsEntryApp(initials_root, initials_callback=lambda initials: initials_root.destroy())
     initials_root.mainloop()
     entered_initials = initials_app.entered_initials
+    loader.join()
+    AudioPlayerApp = importlib.import_module(APP_MODULE).AudioPlayerApp
     audio_player_root = tk.Tk()
     app = AudioPlayerApp(audio_player_root, entered_initials)
     audio_player_root.mainloop()
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ReviewQueue:
+    """
+    The transcript rows that still need a QC label, in row order.
+
+    A row is pending while its quality_check_label is empty; with
+    `min_confidence` set, rows the recogniser was at least that sure of
+    are treated as already reviewed. `next(row)` finds the first pending
+    row at or after `row` through a skip-pointer array with path
+    compression, so stepping through a mostly reviewed file costs
+    amortised O(1) per step rather than a scan over every accepted row.
+
+    Since the labels live in the edited CSV, building the queue from a
+    resumed file picks up where the last session stopped.
+    """
+
+    def __init__(self, df: pd.DataFrame, min_confidence: Optional[float] = None):
+        self.min_confidence = min_confidence
+        self.rebuild(df)
+
+    def rebuild(self, df: pd.DataFrame):
+        pending = df['quality_check_label'].isna().to_numpy()
+        if self.min_confidence is not None:
+            confidence = pd.to_numeric(df['confidence'], errors='coerce').to_numpy(float)
+            pending = pending & ~(confidence >= self.min_confidence)
+        rows = np.arange(len(pending) + 1)
+        # _next[i] == i for a pending row (and the end sentinel); otherwise
+        # it points further along towards the next pending row, starting
+        # out at that row itself.
+        candidates = np.where(np.append(pending, True), rows, len(pending))
+        self._next = np.minimum.accumulate(candidates[::-1])[::-1].tolist()
+        self.remaining = int(pending.sum())
+
+    def __len__(self):
+        return self.remaining
+
+    def _find(self, row):
+        root = row
+        while self._next[root] != root:
+            root = self._next[root]
+        while self._next[row] != root:
+            self._next[row], row = root, self._next[row]
+        return root
+
+    def next(self, row: int = 0) -> Optional[int]:
+        """First pending row at or after `row`, or None when there is none."""
+        row = self._find(min(max(row, 0), len(self._next) - 1))
+        return None if row == len(self._next) - 1 else int(row)
+
+    def mark_reviewed(self, row: int):
+        if 0 <= row < len(self._next) - 1 and self._next[row] == row:
+            self._next[row] = row + 1
+            self.remaining -= 1
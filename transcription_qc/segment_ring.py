@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+
+class SegmentRing:
+    """
+    Playback-ready copies of the audio segments the reviewer is about to
+    play.
+
+    `schedule` takes the sample ranges of the current row and the next few
+    rows; a worker thread slices each one out of the recording into its own
+    contiguous float32 buffer (converting memory-mapped PCM on the way), and
+    ranges that drop out of the window are forgotten. `get` only returns a
+    segment that is already prepared, so starting playback never waits on a
+    decode or a copy.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self.audio = None
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='segments')
+        self._segments = OrderedDict()
+
+    def reset(self, audio):
+        for future in self._segments.values():
+            future.cancel()
+        self._segments.clear()
+        self.audio = audio
+
+    def _slice(self, audio, start, stop):
+        return np.ascontiguousarray(audio[start:stop], dtype=np.float32)
+
+    def schedule(self, ranges: Iterable[Tuple[int, int]]):
+        wanted = list(OrderedDict.fromkeys(ranges))[:self.capacity]
+        for key in list(self._segments):
+            if key not in wanted:
+                self._segments.pop(key).cancel()
+        for key in wanted:
+            if key not in self._segments and self.audio is not None:
+                self._segments[key] = self._executor.submit(self._slice, self.audio, *key)
+
+    def get(self, start: int, stop: int) -> Optional[np.ndarray]:
+        future = self._segments.get((start, stop))
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return future.result()
+
+    def shutdown(self):
+        self.reset(None)
+        self._executor.shutdown(wait=False)
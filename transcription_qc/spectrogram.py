@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SpectrogramTiles:
+    """
+    Log-magnitude STFT of a recording, computed in tiles of `tile_columns`
+    frames on demand.
+
+    The hop between frames is picked per request from the visible time
+    range and rounded up to a power of two, so each zoom level maps to a
+    small set of hop sizes and a tile computed once is reused whenever the
+    view returns to it. Tiles are kept in an LRU of `max_tiles` entries.
+    """
+
+    def __init__(self, audio, sample_rate: int, n_fft: int = 512, tile_columns: int = 256,
+                 max_tiles: int = 64):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.tile_columns = tile_columns
+        self.max_tiles = max_tiles
+        self.window = np.hanning(n_fft).astype(np.float32)
+        self._tiles = OrderedDict()
+
+    def hop_for(self, t0: float, t1: float, max_columns: int) -> int:
+        samples = max(1.0, (t1 - t0) * self.sample_rate)
+        hop = max(self.n_fft // 4, int(np.ceil(samples / max_columns)))
+        return 1 << int(np.ceil(np.log2(hop)))
+
+    def _frames(self, hop, index):
+        start = index * self.tile_columns * hop
+        starts = start + np.arange(self.tile_columns) * hop
+        starts = starts[starts < len(self.audio)]
+        if hop <= self.n_fft:
+            # Overlapping frames: read the tile's span once and window it
+            segment = np.asarray(self.audio[start:start + (self.tile_columns - 1) * hop + self.n_fft], dtype=np.float32)
+            segment = np.pad(segment, (0, max(0, (len(starts) - 1) * hop + self.n_fft - len(segment))))
+            return np.lib.stride_tricks.sliding_window_view(segment, self.n_fft)[::hop][:len(starts)]
+        # Frames far apart: only read the samples each frame covers
+        frames = np.zeros((len(starts), self.n_fft), dtype=np.float32)
+        for i, s in enumerate(starts):
+            chunk = self.audio[s:s + self.n_fft]
+            frames[i, :len(chunk)] = chunk
+        return frames
+
+    def tile(self, hop: int, index: int) -> np.ndarray:
+        key = (hop, index)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        frames = self._frames(hop, index)
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1))
+        tile = (20 * np.log10(spectrum + 1e-10)).astype(np.float32).T
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def render(self, t0: float, t1: float, max_columns: int = 800):
+        """
+        Return (image, extent) covering [t0, t1]: image rows are frequency
+        bins from 0 to Nyquist and extent is (left, right, bottom, top) for
+        `imshow`.
+        """
+        hop = self.hop_for(t0, t1, max_columns)
+        first = max(0, int(t0 * self.sample_rate) // hop)
+        last = max(first, min(len(self.audio) - 1, int(np.ceil(t1 * self.sample_rate))) // hop)
+        tiles = range(first // self.tile_columns, last // self.tile_columns + 1)
+        image = np.concatenate([self.tile(hop, i) for i in tiles], axis=1)
+        offset = tiles[0] * self.tile_columns
+        image = image[:, first - offset:last - offset + 1]
+        left = first * hop / self.sample_rate
+        right = (last + 1) * hop / self.sample_rate
+        return image, (left, right, 0, self.sample_rate / 2)
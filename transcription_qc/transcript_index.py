@@ -0,0 +1,91 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+def _word_key(word):
+    return str(word).lower() if pd.notna(word) else None
+
+
+class TranscriptIndex:
+    """
+    Onset and word lookups over the transcript rows, kept in step with
+    edits, inserts and drops instead of being recomputed from the frame.
+
+    `onsets` mirrors the onset column in row order; while it is sorted,
+    `closest` is a binary search. `needs_sort` is raised when a change puts
+    a row out of onset order, so callers only re-sort the frame when an
+    edit actually broke the order.
+    """
+
+    def __init__(self, df):
+        self.onsets = df['onset'].to_numpy(dtype=float).copy()
+        self.keys = [_word_key(word) for word in df['word']]
+        self.rows = {}
+        for row, key in enumerate(self.keys):
+            if key is not None:
+                self.rows.setdefault(key, []).append(row)
+        self.needs_sort = bool(np.any(np.diff(self.onsets) < 0))
+
+    def __len__(self):
+        return len(self.onsets)
+
+    def closest(self, time: float) -> int:
+        if not len(self.onsets):
+            return -1
+        if self.needs_sort:
+            return int(np.argmin(np.abs(self.onsets - time)))
+        i = int(np.searchsorted(self.onsets, time))
+        if i == len(self.onsets):
+            return i - 1
+        if i > 0 and time - self.onsets[i - 1] <= self.onsets[i] - time:
+            return i - 1
+        return i
+
+    def find_word(self, word: str) -> int:
+        rows = self.rows.get(_word_key(word))
+        return rows[0] if rows else -1
+
+    def update(self, row: int, word, onset: float):
+        self._unlink(row)
+        self.keys[row] = _word_key(word)
+        self._link(row)
+        self.onsets[row] = onset
+        self._check_order(row)
+
+    def insert(self, row: int, word, onset: float):
+        self._shift(row, 1)
+        self.keys.insert(row, _word_key(word))
+        self._link(row)
+        self.onsets = np.insert(self.onsets, row, onset)
+        self._check_order(row)
+
+    def remove(self, row: int):
+        self._unlink(row)
+        del self.keys[row]
+        self.onsets = np.delete(self.onsets, row)
+        self._shift(row, -1)
+
+    def _link(self, row):
+        key = self.keys[row]
+        if key is not None:
+            bisect.insort(self.rows.setdefault(key, []), row)
+
+    def _unlink(self, row):
+        key = self.keys[row]
+        if key is not None:
+            rows = self.rows[key]
+            rows.remove(row)
+            if not rows:
+                del self.rows[key]
+
+    def _shift(self, start, delta):
+        for rows in self.rows.values():
+            for i in range(bisect.bisect_left(rows, start), len(rows)):
+                rows[i] += delta
+
+    def _check_order(self, row):
+        onset = self.onsets[row]
+        if (row > 0 and self.onsets[row - 1] > onset) or (row + 1 < len(self.onsets) and onset > self.onsets[row + 1]):
+            self.needs_sort = True
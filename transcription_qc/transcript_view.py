@@ -0,0 +1,80 @@
+import math
+
+
+def format_cell(value) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        # Fixed decimals as pandas showed them, so onsets past 1000 s keep
+        # their milliseconds; trailing zeros are trimmed to one.
+        text = f'{value:.6f}'.rstrip('0')
+        return text + '0' if text.endswith('.') else text
+    return str(value)
+
+
+class TranscriptView:
+    """
+    Keep a tk.Text showing a transcript DataFrame in sync row by row.
+
+    The table is formatted once by `render`; afterwards moving the current
+    row only moves the highlight tag, and edits, inserts and drops rewrite
+    the affected line. A full render only happens again when a patched
+    value no longer fits its column. Line 1 holds the header and row `i`
+    is on line `i + 2`.
+    """
+
+    def __init__(self, text, highlight_color: str = "yellow"):
+        self.text = text
+        self.text.tag_configure("highlight", background=highlight_color)
+        self.columns = []
+        self.widths = []
+        self.highlighted = None
+
+    def render(self, df, highlight=None):
+        self.columns = list(df.columns)
+        cells = [df[col].map(format_cell).tolist() for col in self.columns]
+        self.widths = [max([len(str(col))] + [len(c) for c in column]) for col, column in zip(self.columns, cells)]
+        lines = [self._join([str(col) for col in self.columns])]
+        lines.extend(self._join(row) for row in zip(*cells))
+        self.text.delete(1.0, "end")
+        self.text.insert("end", "\n".join(lines) + "\n")
+        self.highlighted = None
+        self.set_highlight(highlight)
+
+    def _join(self, cells):
+        return "  ".join(cell.rjust(width) for cell, width in zip(cells, self.widths))
+
+    def _format_row(self, df, row):
+        cells = [format_cell(value) for value in df.iloc[row].tolist()]
+        if list(df.columns) != self.columns or any(len(c) > w for c, w in zip(cells, self.widths)):
+            return None
+        return self._join(cells)
+
+    def set_highlight(self, row):
+        self.text.tag_remove("highlight", 1.0, "end")
+        self.highlighted = row
+        if row is not None and row >= 0:
+            line = row + 2
+            self.text.tag_add("highlight", f"{line}.0", f"{line}.end")
+            self.text.see(f"{line}.0")
+
+    def update_row(self, df, row):
+        line = self._format_row(df, row)
+        if line is None:
+            self.render(df, self.highlighted)
+            return
+        self.text.delete(f"{row + 2}.0", f"{row + 2}.end")
+        self.text.insert(f"{row + 2}.0", line)
+        self.set_highlight(self.highlighted)
+
+    def insert_row(self, df, row):
+        line = self._format_row(df, row)
+        if line is None:
+            self.render(df, self.highlighted)
+            return
+        self.text.insert(f"{row + 2}.0", line + "\n")
+        self.set_highlight(self.highlighted)
+
+    def delete_row(self, row):
+        self.text.delete(f"{row + 2}.0", f"{row + 3}.0")
+        self.set_highlight(self.highlighted)
@@ -0,0 +1,135 @@
+import hashlib
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+PEAKS_SUFFIX = '.peaks.npz'
+# Kept per user rather than next to the recordings, so opening a study
+# share never writes into it.
+DEFAULT_PEAKS_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'transcription_qc', 'peaks')
+
+
+def peaks_path_for(wav_path: str, cache_dir: str = DEFAULT_PEAKS_DIR) -> str:
+    key = hashlib.sha1(os.path.abspath(wav_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, key + PEAKS_SUFFIX)
+
+
+def _reduce(values, size, func):
+    pad = -len(values) % size
+    if pad:
+        values = np.concatenate([values, np.repeat(values[-1:], pad)])
+    return func(values.reshape(-1, size), axis=1)
+
+
+class WaveformPyramid:
+    """
+    Min/max envelope of a recording at successively coarser resolutions.
+
+    Level 0 summarises every `block` samples, and each further level merges
+    `factor` blocks of the level below, until a level has at most
+    `min_blocks` blocks. Drawing a time range therefore costs the same
+    number of points whatever the length of the recording.
+    """
+
+    def __init__(self, levels, sample_rate: int, frames: int, block: int, factor: int):
+        self.levels = levels
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.block = block
+        self.factor = factor
+
+    @classmethod
+    def build(cls, audio, sample_rate: int, block: int = 256, factor: int = 4,
+              min_blocks: int = 1024, chunk_blocks: int = 4096) -> 'WaveformPyramid':
+        frames = len(audio)
+        chunk = block * chunk_blocks
+        mins, maxs = [], []
+        for start in range(0, frames, chunk):
+            samples = np.asarray(audio[start:start + chunk], dtype=np.float32)
+            mins.append(_reduce(samples, block, np.min))
+            maxs.append(_reduce(samples, block, np.max))
+        if not mins:
+            mins = maxs = [np.zeros(1, dtype=np.float32)]
+        levels = [(np.concatenate(mins), np.concatenate(maxs))]
+        while len(levels[-1][0]) > min_blocks:
+            low, high = levels[-1]
+            levels.append((_reduce(low, factor, np.min), _reduce(high, factor, np.max)))
+        return cls(levels, sample_rate, frames, block, factor)
+
+    def block_size(self, level: int) -> int:
+        return self.block * self.factor ** level
+
+    def envelope(self, t0: float, t1: float, max_points: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return (x, y) for a Line2D tracing the envelope between t0 and t1
+        with at most about 2 * max_points vertices, or None when the range
+        holds few enough samples to draw them directly.
+        """
+        span = (t1 - t0) * self.sample_rate
+        if span <= max_points * 2:
+            return None
+        level = len(self.levels) - 1
+        for k in range(len(self.levels)):
+            if span / self.block_size(k) <= max_points:
+                level = k
+                break
+        size = self.block_size(level)
+        low, high = self.levels[level]
+        i0 = max(0, int(t0 * self.sample_rate // size))
+        i1 = min(len(low), int(np.ceil(t1 * self.sample_rate / size)) + 1)
+        x = np.repeat(np.arange(i0, i1) * size / self.sample_rate, 2)
+        y = np.empty(2 * (i1 - i0), dtype=np.float32)
+        y[0::2] = low[i0:i1]
+        y[1::2] = high[i0:i1]
+        return x, y
+
+    def save(self, path: str, source_mtime_ns: int):
+        arrays = {}
+        for k, (low, high) in enumerate(self.levels):
+            arrays[f'min_{k}'] = low
+            arrays[f'max_{k}'] = high
+        meta = np.array([self.sample_rate, self.frames, self.block, self.factor, source_mtime_ns], dtype=np.int64)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=meta, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source_mtime_ns: int) -> Optional['WaveformPyramid']:
+        with np.load(path) as data:
+            sample_rate, frames, block, factor, mtime_ns = (int(v) for v in data['meta'])
+            if mtime_ns != source_mtime_ns:
+                return None
+            levels = []
+            while f'min_{len(levels)}' in data:
+                k = len(levels)
+                levels.append((data[f'min_{k}'], data[f'max_{k}']))
+        return cls(levels, sample_rate, frames, block, factor)
+
+
+def load_or_build_pyramid(wav_path: str, audio, sample_rate: int, persist: bool = True,
+                          cache_dir: str = DEFAULT_PEAKS_DIR) -> WaveformPyramid:
+    """
+    Load the pyramid cached for `wav_path` in `cache_dir` if it matches the
+    WAV's mtime, otherwise build it and (when `persist`) try to cache it.
+    An unreadable or unwritable cache only means the pyramid is rebuilt.
+    """
+    peaks_path = peaks_path_for(wav_path, cache_dir)
+    mtime_ns = os.stat(wav_path).st_mtime_ns
+    if persist and os.path.exists(peaks_path):
+        try:
+            pyramid = WaveformPyramid.load(peaks_path, mtime_ns)
+        except (OSError, ValueError, KeyError):
+            pyramid = None
+        if pyramid is not None and pyramid.frames == len(audio):
+            return pyramid
+    pyramid = WaveformPyramid.build(audio, sample_rate)
+    if persist:
+        try:
+            pyramid.save(peaks_path, mtime_ns)
+        except OSError:
+            pass
+    return pyramid
@@ -0,0 +1,135 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from .blit import BlitManager, set_span
+
+
+class WaveformView:
+    """
+    The waveform figure with its cursor and section overlays.
+
+    It is built once per window and pointed at each new recording with
+    `set_data`, so switching files reuses the figure, canvas widget and
+    artists instead of stacking a new figure on top of the old one. The
+    figure is created without pyplot, which would otherwise keep every
+    figure alive in its global registry.
+
+    An optional spectrogram panel below the waveform shares its time axis
+    and is filled from `SpectrogramTiles` for the visible range only.
+    """
+
+    def __init__(self, master, plot_points: int = 4000, spectrogram_columns: int = 800):
+        self.plot_points = plot_points
+        self.spectrogram_columns = spectrogram_columns
+        self.audio_data = None
+        self.rate = 1
+        self.waveform = None
+        self.spectrogram = None
+
+        self.fig = Figure()
+        self._grid = self.fig.add_gridspec(2, 1, hspace=0.35)
+        self.ax = self.fig.add_subplot()
+        self._full_position = self.ax.get_position()
+        self.spec_ax = self.fig.add_subplot(self._grid[1], sharex=self.ax)
+        self.spec_ax.set_autoscale_on(False)
+        self.spec_image = self.spec_ax.imshow(np.zeros((1, 1)), aspect='auto', origin='lower', cmap='magma')
+        self.spec_ax.set_xlabel('Time (seconds)')
+        self.spec_ax.set_ylabel('Frequency (Hz)')
+        self.spec_ax.set_visible(False)
+        self.line, = self.ax.plot([], [])
+        self.red_cursor_line = self.ax.axvline(x=0, color='red', linestyle='-', linewidth=2)
+        self.green_cursor_line, = self.ax.plot([0, 0], [-1, 1], color='green', linestyle='-', linewidth=2, visible=False)
+        self.yellow_start_line = self.ax.axvline(x=0, color='yellow', linestyle='-', linewidth=1, visible=False)
+        self.red_highlight_space = self.ax.axvspan(0, 0, color='red', alpha=0, label='Highlighted Area')
+        self.yellow_end_line = self.ax.axvline(x=0, color='yellow', linestyle='-', linewidth=1, visible=False)
+        self.blue_start_line = self.ax.axvline(x=0, color='blue', linestyle='-', linewidth=1, visible=False)
+        self.blue_highlight_space = self.ax.axvspan(0, 0, color='blue', alpha=0, label='Insert Area', visible=False)
+        self.blue_end_line = self.ax.axvline(x=0, color='blue', linestyle='-', linewidth=1, visible=False)
+        self.ax.set_ylim(-1, 1)
+        self.ax.set_xlabel('Time (seconds)')
+        self.ax.set_ylabel('Amplitude')
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.blit = BlitManager(self.canvas, [
+            self.red_highlight_space, self.blue_highlight_space,
+            self.yellow_start_line, self.yellow_end_line,
+            self.blue_start_line, self.blue_end_line,
+            self.red_cursor_line, self.green_cursor_line,
+        ])
+        self._cids = []
+
+    def connect(self, event: str, handler):
+        self._cids.append(self.canvas.mpl_connect(event, handler))
+
+    def set_data(self, audio_data, rate: int, waveform, x_range, cursor: float = 0,
+                 start_section: float = 0, end_section: float = 0, spectrogram=None):
+        self.audio_data = audio_data
+        self.rate = rate
+        self.waveform = waveform
+        self.spectrogram = spectrogram
+        self._layout()
+        self.red_cursor_line.set_xdata([cursor, cursor])
+        self.green_cursor_line.set_visible(False)
+        for line, x in ((self.yellow_start_line, start_section), (self.yellow_end_line, end_section),
+                        (self.blue_start_line, start_section), (self.blue_end_line, end_section)):
+            line.set_xdata([x, x])
+            line.set_visible(False)
+        set_span(self.red_highlight_space, start_section, end_section)
+        self.red_highlight_space.set_alpha(0)
+        set_span(self.blue_highlight_space, start_section, end_section)
+        self.blue_highlight_space.set_alpha(0)
+        self.blue_highlight_space.set_visible(False)
+        self.set_xlim(x_range)
+
+    def set_spectrogram(self, spectrogram):
+        """Show the panel for `spectrogram`, or hide it when None."""
+        self.spectrogram = spectrogram
+        self._layout()
+        self.update_spectrogram(self.ax.get_xlim())
+
+    def _layout(self):
+        if self.spectrogram is None:
+            self.ax.set_position(self._full_position)
+        else:
+            self.ax.set_position(self._grid[0].get_position(self.fig))
+        self.spec_ax.set_visible(self.spectrogram is not None)
+
+    def set_xlim(self, x_range):
+        self.ax.set_xlim(x_range)
+        self.update_waveform(x_range)
+        self.update_spectrogram(x_range)
+
+    def update_waveform(self, x_range):
+        # Draw the min/max envelope level matching the visible range, and
+        # the raw samples once the view is narrow enough to show them.
+        t0, t1 = x_range
+        envelope = self.waveform.envelope(t0, t1, self.plot_points)
+        if envelope is None:
+            start = max(0, int(t0 * self.rate))
+            samples = self.audio_data[start:int(np.ceil(t1 * self.rate)) + 1]
+            envelope = (np.arange(start, start + len(samples)) / self.rate, samples)
+        self.line.set_data(*envelope)
+
+    def update_spectrogram(self, x_range):
+        if self.spectrogram is None:
+            return
+        image, extent = self.spectrogram.render(x_range[0], x_range[1], self.spectrogram_columns)
+        top = float(image.max())
+        self.spec_image.set_data(image)
+        self.spec_image.set_extent(extent)
+        self.spec_image.set_clim(top - 80, top)
+        self.spec_ax.set_ylim(0, extent[3])
+
+    def draw(self):
+        self.canvas.draw()
+
+    def destroy(self):
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
+        self._cids = []
+        self.blit.disconnect()
+        self.widget.destroy()
+        self.fig.clear()
+        self.audio_data = self.waveform = self.spectrogram = None